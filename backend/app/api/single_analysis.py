@@ -4,15 +4,22 @@ Single Stock Analysis API Endpoint
 
 from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import Optional, Dict, Any
-from datetime import datetime
 from dataclasses import dataclass
 
-from app.engine.modular_recommender import run_single_analysis
 from app.simple_auth import verify_api_key
+from app.json_utils import NumpyORJSONResponse
+from app.clock import utc_now_iso
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
-@router.get("/{ticker}")
+
+def run_single_analysis(*args, **kwargs):
+    """Analyze one ticker, importing the engine (pandas/numpy/yfinance) on first use"""
+    from app.engine.modular_recommender import run_single_analysis as run
+    return run(*args, **kwargs)
+
+
+@router.get("/{ticker}", response_class=NumpyORJSONResponse)
 def analyze_single_stock(
     ticker: str,
     period: str = Query(default="1y", description="Analysis period (1y, 6mo, 3mo, 1mo)"),
@@ -30,76 +37,48 @@ def analyze_single_stock(
         if not ticker:
             raise HTTPException(status_code=400, detail="Ticker symbol is required")
         
-        # Simple test response first
-        # Test data loading
-        from app.modules.data_loader import DataLoader
-        loader = DataLoader()
-        df = loader.fetch_single_ticker(ticker, period)
-        
         # Run single ticker analysis
         try:
             result = run_single_analysis(ticker, period)
             
-            # Convert numpy types to Python types for JSON serialization
-            def convert_numpy(obj):
-                if hasattr(obj, 'item'):  # numpy scalar
-                    return obj.item()
-                elif hasattr(obj, 'tolist'):  # numpy array
-                    return obj.tolist()
-                elif isinstance(obj, dict):
-                    return {k: convert_numpy(v) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [convert_numpy(v) for v in obj]
-                else:
-                    return obj
-            
-            converted_result = convert_numpy(result)
-            
-            return {
+            # Returned as a response so numpy values are encoded by orjson directly
+            return NumpyORJSONResponse({
                 "success": True,
-                "data": converted_result,
-                "timestamp": datetime.utcnow().isoformat()
-            }
+                "data": result,
+                "timestamp": utc_now_iso()
+            })
         except Exception as analysis_error:
-            return {
+            return NumpyORJSONResponse({
                 "success": False,
                 "data": {"error": str(analysis_error)},
-                "timestamp": datetime.utcnow().isoformat()
-            }
-        
-        # Run single ticker analysis (commented out for testing)
-        # result = run_single_analysis(ticker, period)
-        # return {
-        #     "success": True,
-        #     "data": result,
-        #     "timestamp": datetime.utcnow().isoformat()
-        # }
-        
+                "timestamp": utc_now_iso()
+            })
+            
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-@router.get("/{ticker}/signals")
+@router.get("/{ticker}/signals", response_class=NumpyORJSONResponse)
 def get_ticker_signals(ticker: str, period: str = Query(default="1y"), auth: bool = Depends(verify_api_key)):
     """Get detailed signal analysis for a ticker"""
     try:
         ticker = ticker.upper().strip()
-        result = run_single_analysis(ticker, period)
+        result = run_single_analysis(ticker, period, include_history=True)
         
         # Extract signal data
         signals = result.get('detailed_analysis', {}).get('signal_summary', {})
         signal_history = result.get('detailed_analysis', {}).get('signal_history', [])
         
-        return {
+        return NumpyORJSONResponse({
             'ticker': ticker,
             'current_signals': signals,
             'signal_history': signal_history,
-            'timestamp': datetime.utcnow().isoformat()
-        }
+            'timestamp': utc_now_iso()
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Signal analysis failed: {str(e)}")
 
-@router.get("/{ticker}/indicators")
+@router.get("/{ticker}/indicators", response_class=NumpyORJSONResponse)
 def get_ticker_indicators(ticker: str, period: str = Query(default="1y")):
     """Get technical indicators for a ticker"""
     try:
@@ -109,11 +88,11 @@ def get_ticker_indicators(ticker: str, period: str = Query(default="1y")):
         # Extract indicator data
         indicators = result.get('detailed_analysis', {}).get('indicator_summary', {})
         
-        return {
+        return NumpyORJSONResponse({
             'ticker': ticker,
             'indicators': indicators,
-            'timestamp': datetime.utcnow().isoformat()
-        }
+            'timestamp': utc_now_iso()
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Indicator analysis failed: {str(e)}")
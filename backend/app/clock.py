@@ -0,0 +1,19 @@
+"""
+Cheap wall-clock timestamps for API response payloads
+"""
+
+import time
+
+# (epoch second, formatted string); swapped as one tuple so concurrent readers never see a torn pair
+_cached = (-1, '')
+
+
+def utc_now_iso() -> str:
+    """Naive UTC ISO-8601 timestamp at one-second resolution, formatted at most once per second"""
+    global _cached
+    second = int(time.time())
+    cached_second, text = _cached
+    if second != cached_second:
+        text = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _cached = (second, text)
+    return text
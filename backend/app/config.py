@@ -3,12 +3,17 @@ Configuration settings for the Stock Recommendation Engine
 """
 
 import os
+import sys
+from pathlib import Path
 from typing import List
 
 
+# Read once; every Lambda/local switch below derives from this
+_LAMBDA_FN = os.getenv('AWS_LAMBDA_FUNCTION_NAME')
+
 # AWS Configuration
 AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
-if os.getenv('AWS_LAMBDA_FUNCTION_NAME'):
+if _LAMBDA_FN:
     S3_BUCKET_NAME = os.getenv('S3_BUCKET_NAME_PROD', '7h-stock-analyzer')
 else:
     S3_BUCKET_NAME = os.getenv('S3_BUCKET_NAME_LOCAL', '7h-stock-analyzer-dev')
@@ -23,38 +28,61 @@ BATCH_SIZE = int(os.getenv('BATCH_SIZE', '50'))
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
 
 # Stock Symbols Configuration
+FALLBACK_SYMBOLS = tuple(sys.intern(s) for s in (
+    'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'JPM',
+    'JNJ', 'V', 'PG', 'UNH', 'HD', 'MA', 'BAC', 'XOM', 'PFE', 'CSCO', 'ADBE'
+))
+
+# Candidate symbol files, in priority order (portfolio first); the first one found wins
+_SYMBOL_CONFIG_FILES = (
+    'input/config_portfolio.txt',
+    'input/config_watchlist.txt',
+    'input/config_us_stocks.txt',
+    'input/config_etfs.txt'
+)
+
+# Parsed symbol files keyed by path -> (mtime_ns, symbols); re-read only when the file changes
+_symbols_cache = {}
+
+def _read_symbols_file(config_file: str) -> tuple:
+    """Parse a symbols file, reusing the previous result while its mtime is unchanged"""
+    mtime = os.stat(config_file).st_mtime_ns
+    cached = _symbols_cache.get(config_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    # Config files are small: one read() beats line-mode iteration
+    raw = Path(config_file).read_text(encoding='utf-8')
+    # First token of each non-comment line, kept verbatim so Yahoo symbols like ^GSPC, ES=F and BRK.B survive;
+    # dict.fromkeys drops repeated tickers but keeps the order the file lists them in
+    symbols = dict.fromkeys(
+        sys.intern(line.split()[0].upper())
+        for line in map(str.strip, raw.splitlines())
+        if line and not line.startswith('#') and not line.startswith('//')
+    )
+    print(f"Loaded {len(symbols)} symbols from {config_file}")
+    
+    result = tuple(symbols)
+    _symbols_cache[config_file] = (mtime, result)
+    return result
+
 def load_symbols_from_config() -> List[str]:
     """Load stock symbols from configuration files"""
     symbols = []
     
-    # Try to load from portfolio config first
-    config_files = [
-        'input/config_portfolio.txt',
-        'input/config_watchlist.txt',
-        'input/config_us_stocks.txt',
-        'input/config_etfs.txt'
-    ]
-    
-    for config_file in config_files:
+    for config_file in _SYMBOL_CONFIG_FILES:
         try:
-            if os.path.exists(config_file):
-                with open(config_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and not line.startswith('//'):
-                            symbols.append(line.upper().strip())
-                print(f"Loaded {len([s for s in symbols if s])} symbols from {config_file}")
-                break  # Use first available config file
+            symbols = list(_read_symbols_file(config_file))
+            break  # Use first available config file
+        except FileNotFoundError:
+            continue
         except Exception as e:
             print(f"Error loading {config_file}: {e}")
             continue
     
     # Fallback symbols if no config files found
     if not symbols:
-        symbols = [
-            'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'JPM', 
-            'JNJ', 'V', 'PG', 'UNH', 'HD', 'MA', 'BAC', 'XOM', 'PFE', 'CSCO', 'ADBE'
-        ]
+        symbols = list(FALLBACK_SYMBOLS)
         print("Using fallback symbol list")
     
     return symbols
@@ -63,11 +91,11 @@ def load_symbols_from_config() -> List[str]:
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 ENABLE_DEBUG_LOGGING = LOG_LEVEL.upper() == 'DEBUG'
 ENABLE_VERBOSE_LOGGING = os.getenv('ENABLE_VERBOSE_LOGGING', 'false').lower() == 'true'
-ENVIRONMENT = 'aws' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'local'
+ENVIRONMENT = 'aws' if _LAMBDA_FN else 'local'
 
 # Cost-optimized logging settings
 # AWS Lambda defaults to WARNING level, localhost defaults to INFO
-DEFAULT_LOG_LEVEL = 'WARNING' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'INFO'
+DEFAULT_LOG_LEVEL = 'WARNING' if _LAMBDA_FN else 'INFO'
 LOG_RETENTION_DAYS = int(os.getenv('LOG_RETENTION_DAYS', '7'))
 ENABLE_STRUCTURED_LOGGING = os.getenv('ENABLE_STRUCTURED_LOGGING', 'true').lower() == 'true'
 
@@ -88,18 +116,23 @@ NOTIFICATION_PRIORITY_THRESHOLD = int(os.getenv('NOTIFICATION_PRIORITY_THRESHOLD
 # Performance Configuration
 REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '30'))
 MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', '10'))
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '4'))
+BATCH_TIMEOUT = int(os.getenv('BATCH_TIMEOUT', '0'))  # seconds before /run-now stops waiting; 0 waits for the run to finish
 
 # Environment Detection
-IS_LAMBDA = os.getenv('AWS_LAMBDA_FUNCTION_NAME') is not None
+IS_LAMBDA = _LAMBDA_FN is not None
 IS_LOCAL = not IS_LAMBDA
+# 'api' serves API Gateway and EventBridge events; 'cron' is an EventBridge-only deployment that never loads Mangum
+LAMBDA_ROLE = os.getenv('LAMBDA_ROLE', 'api').lower()
 
 # Cache Configuration (for future use)
 ENABLE_CACHE = os.getenv('ENABLE_CACHE', 'false').lower() == 'true'
 CACHE_TTL = int(os.getenv('CACHE_TTL', '300'))  # 5 minutes
+CONFIG_CACHE_TTL = int(os.getenv('CONFIG_CACHE_TTL', '60'))  # seconds an S3 config.json read is reused
 
 # Security Configuration
 ENABLE_CORS = os.getenv('ENABLE_CORS', 'true').lower() == 'true'
-ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', '*').split(',')
+ALLOWED_ORIGINS = tuple(o.strip() for o in os.getenv('ALLOWED_ORIGINS', '*').split(','))
 
 # Rate Limiting (for future use)
 ENABLE_RATE_LIMITING = os.getenv('ENABLE_RATE_LIMITING', 'false').lower() == 'true'
@@ -109,3 +142,6 @@ RATE_LIMIT_PER_MINUTE = int(os.getenv('RATE_LIMIT_PER_MINUTE', '60'))
 ENABLE_ADVANCED_ANALYSIS = os.getenv('ENABLE_ADVANCED_ANALYSIS', 'true').lower() == 'true'
 ENABLE_FUNDAMENTAL_ANALYSIS = os.getenv('ENABLE_FUNDAMENTAL_ANALYSIS', 'true').lower() == 'true'
 ENABLE_PATTERN_RECOGNITION = os.getenv('ENABLE_PATTERN_RECOGNITION', 'false').lower() == 'true'
+# Optional API surfaces; disabled routes are never registered, and their modules never imported
+ENABLE_RECON_API = os.getenv('ENABLE_RECON_API', 'true').lower() == 'true'
+ENABLE_SYMBOL_ANALYSIS_API = os.getenv('ENABLE_SYMBOL_ANALYSIS_API', 'true').lower() == 'true'
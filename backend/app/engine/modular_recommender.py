@@ -3,21 +3,152 @@ Modular Stock Analysis Engine - Orchestrates all modules for complete analysis
 """
 
 import os
+import sys
+import time
 import logging
-import pandas as pd
-from typing import List, Dict, Any
-from datetime import datetime
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_all_start_methods, get_context
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional, Tuple
+from datetime import datetime, timedelta
 
 from app.modules import DataLoader, IndicatorEngine, SignalEngine, RecommendationEngine
 from app.services.config_manager import load_config_from_s3
+from app.models import AnalysisMetadata
+from app.config import (
+    MAX_CONCURRENT_REQUESTS, IS_LAMBDA, ENABLE_CACHE, CACHE_TTL, BATCH_SIZE, S3_BUCKET_NAME,
+    ENABLE_VERBOSE_LOGGING
+)
+
+if TYPE_CHECKING:
+    import pandas as pd  # annotations only; the engines import pandas themselves
 
 logger = logging.getLogger(__name__)
 
+# Per-ticker indicator/signal work is CPU-bound pandas, so fan out across processes
+# where there are cores to use (Lambda at typical memory sizes has a single vCPU)
+USE_PROCESS_POOL = MAX_CONCURRENT_REQUESTS > 1 and not IS_LAMBDA
+
+# One worker pool per process, created on first use and shared by every analysis run. Workers come from a
+# forkserver (spawn where unavailable), never a fork of this process: runs start on request threads while
+# the prefetch thread is inside boto3/requests, and a fork would copy those threads' held locks
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+# Tickers last resolved from S3 config as (monotonic time, tickers); reused for CACHE_TTL when ENABLE_CACHE
+_default_tickers_cache = None
+
+# Fallback universe when no S3 configuration is available (interned, immutable)
+DEFAULT_TICKERS = tuple(sys.intern(t) for t in (
+    'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'NVDA', 'TSLA',
+    'JPM', 'V', 'JNJ', 'WMT', 'PG', 'UNH', 'MA', 'HD'
+))
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _utc_isoformat(ts_ns: int = None) -> str:
+    """Naive UTC ISO-8601 string, same format as datetime.utcnow().isoformat()"""
+    if ts_ns is None:
+        ts_ns = time.time_ns()
+    return (_EPOCH + timedelta(microseconds=ts_ns // 1000)).isoformat()
+
+
+# Static part of the result returned when a single-ticker analysis fails
+_EMPTY_ANALYSIS = {
+    'recommendation': 'Hold',
+    'score': 0.0,
+    'confidence_level': 'Low',
+    'reasoning': 'Analysis failed - insufficient data or technical error'
+}
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Shared analysis worker pool (MAX_CONCURRENT_REQUESTS processes), created on first use"""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                if 'forkserver' in get_all_start_methods():
+                    context = get_context('forkserver')
+                    # Workers fork from a server that already imported the engine, so each starts warm
+                    context.set_forkserver_preload([__name__])
+                else:
+                    context = get_context('spawn')
+                _process_pool = ProcessPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS, mp_context=context)
+    return _process_pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next run starts a fresh one"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+
+
+@lru_cache(maxsize=1)
+def _get_worker_engines() -> Tuple[IndicatorEngine, SignalEngine, RecommendationEngine]:
+    """Process-local engines reused across worker calls"""
+    return IndicatorEngine(), SignalEngine(), RecommendationEngine()
+
+
+def _analyze_one(item: Tuple[str, 'pd.DataFrame'], timestamp: Optional[str] = None) -> Tuple[str, Optional[Dict], int, Optional[Tuple[str, str]]]:
+    """
+    Run indicators -> signals -> recommendation for one ticker
+    
+    Only the recommendation dict and the row count leave this function, so the
+    intermediate DataFrames are released before the next ticker is processed.
+    timestamp, if given, is stamped on the recommendation instead of the current time.
+    
+    Returns (ticker, recommendation, data_points, failure). On failure the
+    recommendation is None (or an empty Hold for recommendation errors) and
+    failure is a (stage, reason) pair for the caller to aggregate, rather than
+    logging per ticker.
+    """
+    ticker, df = item
+    indicator_engine, signal_engine, recommendation_engine = _get_worker_engines()
+    
+    try:
+        df_with_indicators = indicator_engine.compute_all_indicators(df)
+        if df_with_indicators.empty:
+            return ticker, None, 0, ('indicators', 'empty')
+    except Exception as e:
+        if ENABLE_VERBOSE_LOGGING:
+            logger.error("Error computing indicators for %s: %s", ticker, e)
+        return ticker, None, 0, ('indicators', type(e).__name__)
+    
+    try:
+        df_with_signals = signal_engine.generate_signals(df_with_indicators)
+        del df_with_indicators
+        if df_with_signals.empty:
+            return ticker, None, 0, ('signals', 'empty')
+    except Exception as e:
+        if ENABLE_VERBOSE_LOGGING:
+            logger.error("Error generating signals for %s: %s", ticker, e)
+        return ticker, None, 0, ('signals', type(e).__name__)
+    
+    failure = None
+    try:
+        recommendation = recommendation_engine.generate_recommendations(df_with_signals, ticker, timestamp)
+    except Exception as e:
+        if ENABLE_VERBOSE_LOGGING:
+            logger.error("Error processing %s: %s", ticker, e)
+        recommendation = recommendation_engine._empty_recommendation(ticker)
+        failure = ('recommendation', type(e).__name__)
+    
+    return ticker, recommendation, len(df_with_signals), failure
+
+
 class ModularStockAnalyzer:
     """Main orchestrator for the modular stock analysis system"""
     
     def __init__(self, s3_bucket: str = None, use_cache: bool = False):
-        self.s3_bucket = s3_bucket or os.getenv('S3_BUCKET_NAME', '7h-stock-analyzer-dev')
+        self.s3_bucket = s3_bucket or S3_BUCKET_NAME
         self.use_cache = use_cache  # Disabled for debugging
         
         # Initialize all modules
@@ -31,118 +162,140 @@ class ModularStockAnalyzer:
     def analyze_universe(self, tickers: List[str] = None, period: str = "1y") -> List[Dict]:
         """Complete analysis pipeline for a universe of stocks"""
         try:
-            # Load tickers from configuration if not provided
-            if not tickers:
-                tickers = self._load_default_tickers()
-            
-            if not tickers:
-                logger.warning("No tickers provided for analysis")
-                return []
-            
-            logger.info(f"Starting analysis for {len(tickers)} tickers")
-            
-            # Step 1: Data Loading
-            logger.info("Step 1: Loading OHLCV data...")
-            data_dict = self.data_loader.fetch_universe(tickers, period)
-            
-            if not data_dict:
-                logger.error("No data loaded")
-                return []
-            
-            logger.info(f"Loaded data for {len(data_dict)} tickers")
-            
-            # Step 2: Indicator Computation
-            logger.info("Step 2: Computing technical indicators...")
-            enhanced_data = {}
-            
-            for ticker, df in data_dict.items():
-                try:
-                    df_with_indicators = self.indicator_engine.compute_all_indicators(df)
-                    if not df_with_indicators.empty:
-                        enhanced_data[ticker] = df_with_indicators
-                except Exception as e:
-                    logger.error(f"Error computing indicators for {ticker}: {str(e)}")
-                    continue
-            
-            logger.info(f"Computed indicators for {len(enhanced_data)} tickers")
-            
-            # Step 3: Signal Generation
-            logger.info("Step 3: Generating trading signals...")
-            signal_data = {}
-            
-            for ticker, df in enhanced_data.items():
-                try:
-                    df_with_signals = self.signal_engine.generate_signals(df)
-                    if not df_with_signals.empty:
-                        signal_data[ticker] = df_with_signals
-                except Exception as e:
-                    logger.error(f"Error generating signals for {ticker}: {str(e)}")
-                    continue
-            
-            logger.info(f"Generated signals for {len(signal_data)} tickers")
-            
-            # Step 4: Recommendation Generation
-            logger.info("Step 4: Generating recommendations...")
-            recommendations = self.recommendation_engine.batch_recommendations(signal_data)
-            
-            logger.info(f"Generated {len(recommendations)} recommendations")
-            
-            # Step 5: Add metadata
-            for rec in recommendations:
-                rec['analysis_metadata'] = {
-                    'analysis_period': period,
-                    'data_points': len(signal_data.get(rec['symbol'], pd.DataFrame())),
-                    'cache_used': self.use_cache,
-                    'analysis_timestamp': datetime.utcnow().isoformat()
-                }
-            
-            return recommendations
-            
+            return list(self.iter_analyze_universe(tickers, period))
         except Exception as e:
-            logger.error(f"Error in analysis pipeline: {str(e)}")
+            logger.error("Error in analysis pipeline: %s", e)
             return []
     
-    def analyze_single_ticker(self, ticker: str, period: str = "1y") -> Dict:
-        """Analyze a single ticker"""
+    def iter_analyze_universe(self, tickers: List[str] = None, period: str = "1y") -> Iterator[Dict]:
+        """Yield recommendations one at a time as each ticker's pipeline completes"""
+        # Load tickers from configuration if not provided
+        if not tickers:
+            tickers = self._load_default_tickers()
+        
+        if not tickers:
+            logger.warning("No tickers provided for analysis")
+            return
+        
+        logger.info("Starting analysis for %s tickers", len(tickers))
+        
+        # Load data in BATCH_SIZE chunks, prefetching the next chunk on a background
+        # thread while the current one is analyzed so network and CPU work overlap
+        chunks = [tickers[i:i + BATCH_SIZE] for i in range(0, len(tickers), BATCH_SIZE)]
+        use_pool = USE_PROCESS_POOL and len(tickers) > 1
+        workers = min(MAX_CONCURRENT_REQUESTS, len(tickers))
+        generated = 0
+        loaded = 0
+        failures = []
+        
+        # All recommendations from one run share the same timestamp
+        analysis_timestamp = _utc_isoformat()
+        analyze_one = partial(_analyze_one, timestamp=analysis_timestamp)
+        
+        logger.info("Loading OHLCV data and analyzing in %s chunk(s)...", len(chunks))
+        pool = _get_process_pool() if use_pool else None
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch') as prefetcher:
+            future = prefetcher.submit(self.data_loader.fetch_universe, chunks[0], period)
+            for i in range(len(chunks)):
+                data_dict = future.result()
+                if i + 1 < len(chunks):
+                    future = prefetcher.submit(self.data_loader.fetch_universe, chunks[i + 1], period)
+                
+                loaded += len(data_dict)
+                # Close-only trend averages for the whole chunk in one vectorized pass
+                items = list(self.indicator_engine.compute_universe_trend(data_dict).items())
+                del data_dict
+                
+                # Indicators, signals and recommendation, fused per ticker
+                if use_pool:
+                    chunksize = max(1, len(items) // (workers * 4))
+                    try:
+                        results = list(pool.map(analyze_one, items, chunksize=chunksize))
+                    except BrokenProcessPool:
+                        _discard_process_pool(pool)
+                        raise
+                else:
+                    results = map(analyze_one, items)
+                
+                for ticker, rec, data_points, failure in results:
+                    if failure is not None:
+                        failures.append((ticker, *failure))
+                    if rec is None:
+                        continue
+                    rec['analysis_metadata'] = AnalysisMetadata(
+                        analysis_period=period,
+                        data_points=data_points,
+                        cache_used=self.use_cache,
+                        analysis_timestamp=analysis_timestamp
+                    )
+                    generated += 1
+                    yield rec
+        
+        if not loaded:
+            logger.error("No data loaded")
+            return
+        
+        # One aggregated line instead of a log call per failing ticker
+        if failures:
+            logger.warning("Analysis failed for %s tickers (sample: %s)", len(failures), failures[:5])
+        
+        logger.info("Loaded data for %s tickers", loaded)
+        logger.info("Generated %s recommendations", generated)
+    
+    def analyze_single_ticker(self, ticker: str, period: str = "1y", include_history: bool = False) -> Dict:
+        """Analyze a single ticker; signal_history is only built when include_history is set"""
         try:
             ticker = ticker.upper().strip()
-            logger.info(f"Analyzing single ticker: {ticker}")
+            logger.info("Analyzing single ticker: %s", ticker)
             
             # Step 1: Load data
             df = self.data_loader.fetch_single_ticker(ticker, period)
             if df.empty:
-                logger.warning(f"No data found for {ticker}")
+                logger.warning("No data found for %s", ticker)
                 return self._empty_analysis(ticker)
             
-            # Step 2: Compute indicators
+            # Step 2: Compute indicators (release each stage's input as soon as it is consumed)
             df_indicators = self.indicator_engine.compute_all_indicators(df)
+            del df
             if df_indicators.empty:
-                logger.warning(f"Failed to compute indicators for {ticker}")
+                logger.warning("Failed to compute indicators for %s", ticker)
                 return self._empty_analysis(ticker)
             
             # Step 3: Generate signals
             df_signals = self.signal_engine.generate_signals(df_indicators)
+            del df_indicators
             if df_signals.empty:
-                logger.warning(f"Failed to generate signals for {ticker}")
+                logger.warning("Failed to generate signals for %s", ticker)
                 return self._empty_analysis(ticker)
             
             # Step 4: Generate recommendation
             recommendation = self.recommendation_engine.generate_recommendations(df_signals, ticker)
             
+            # Signal history is only built when requested and there is more than one row
+            signal_history = []
+            if include_history and len(df_signals) > 1:
+                signal_history = self._signal_history_records(df_signals)
+            
             # Add detailed analysis data
             recommendation['detailed_analysis'] = {
                 'indicator_summary': self.indicator_engine.get_indicator_summary(df_signals),
                 'signal_summary': self.signal_engine.get_signal_summary(df_signals),
-                'signal_history': self.signal_engine.get_signal_history(df_signals).to_dict('records') if len(df_signals) > 1 else [],
+                'signal_history': signal_history,
                 'data_validation': self.indicator_engine.validate_indicators(df_signals)
             }
             
             return recommendation
             
         except Exception as e:
-            logger.error(f"Error analyzing {ticker}: {str(e)}")
+            logger.error("Error analyzing %s: %s", ticker, e)
             return self._empty_analysis(ticker)
     
+    def _signal_history_records(self, df_signals: 'pd.DataFrame') -> List[Dict]:
+        """Recent signal rows as a list of dicts (itertuples avoids to_dict('records') boxing)"""
+        history = self.signal_engine.get_signal_history(df_signals)
+        columns = list(history.columns)
+        return [dict(zip(columns, row)) for row in history.itertuples(index=False, name=None)]
+    
     def get_cache_statistics(self) -> Dict:
         """Get cache statistics"""
         return self.data_loader.get_cache_stats()
@@ -153,41 +306,40 @@ class ModularStockAnalyzer:
     
     def _load_default_tickers(self) -> List[str]:
         """Load default tickers from configuration"""
+        global _default_tickers_cache
         try:
+            if ENABLE_CACHE and _default_tickers_cache and time.monotonic() - _default_tickers_cache[0] < CACHE_TTL:
+                return list(_default_tickers_cache[1])
+            
             # Try to load from S3 configuration (portfolio first, then watchlist)
             config_result = load_config_from_s3('portfolio')
             if config_result.get('success') and config_result.get('symbols'):
-                logger.info(f"Loaded {len(config_result['symbols'])} tickers from portfolio config")
+                logger.info("Loaded %s tickers from portfolio config", len(config_result['symbols']))
+                _default_tickers_cache = (time.monotonic(), tuple(config_result['symbols']))
                 return config_result['symbols']
             
             # Fallback to watchlist
             config_result = load_config_from_s3('watchlist')
             if config_result.get('success') and config_result.get('symbols'):
-                logger.info(f"Loaded {len(config_result['symbols'])} tickers from watchlist config")
+                logger.info("Loaded %s tickers from watchlist config", len(config_result['symbols']))
+                _default_tickers_cache = (time.monotonic(), tuple(config_result['symbols']))
                 return config_result['symbols']
             
             # Fallback to default list
-            default_tickers = [
-                'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'NVDA', 'TSLA',
-                'JPM', 'V', 'JNJ', 'WMT', 'PG', 'UNH', 'MA', 'HD'
-            ]
-            
-            logger.info(f"Using default ticker list: {len(default_tickers)} tickers")
-            return default_tickers
+            logger.info("Using default ticker list: %s tickers", len(DEFAULT_TICKERS))
+            return list(DEFAULT_TICKERS)
             
         except Exception as e:
-            logger.error(f"Error loading default tickers: {str(e)}")
+            logger.error("Error loading default tickers: %s", e)
             return []
     
     def _empty_analysis(self, ticker: str) -> Dict:
         """Return empty analysis result"""
         return {
             'symbol': ticker,
-            'recommendation': 'Hold',
-            'score': 0.0,
-            'confidence_level': 'Low',
-            'reasoning': 'Analysis failed - insufficient data or technical error',
-            'timestamp': datetime.utcnow().isoformat(),
+            **_EMPTY_ANALYSIS,
+            'timestamp': _utc_isoformat(),
+            # Built per call so callers never share (and mutate) the nested containers
             'detailed_analysis': {
                 'indicator_summary': {},
                 'signal_summary': {},
@@ -198,12 +350,15 @@ class ModularStockAnalyzer:
 
 # Global instance for Lambda usage
 _analyzer_instance = None
+_analyzer_lock = threading.Lock()
 
 def get_analyzer() -> ModularStockAnalyzer:
     """Get or create analyzer instance"""
     global _analyzer_instance
     if _analyzer_instance is None:
-        _analyzer_instance = ModularStockAnalyzer()
+        with _analyzer_lock:
+            if _analyzer_instance is None:
+                _analyzer_instance = ModularStockAnalyzer()
     return _analyzer_instance
 
 def run_modular_analysis(tickers: List[str] = None, period: str = "1y") -> List[Dict]:
@@ -211,7 +366,7 @@ def run_modular_analysis(tickers: List[str] = None, period: str = "1y") -> List[
     analyzer = get_analyzer()
     return analyzer.analyze_universe(tickers, period)
 
-def run_single_analysis(ticker: str, period: str = "1y") -> Dict:
+def run_single_analysis(ticker: str, period: str = "1y", include_history: bool = False) -> Dict:
     """Run single ticker analysis"""
     analyzer = get_analyzer()
-    return analyzer.analyze_single_ticker(ticker, period)
+    return analyzer.analyze_single_ticker(ticker, period, include_history)
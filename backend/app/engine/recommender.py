@@ -3,24 +3,217 @@ Stock Recommendation Engine - Migrated from BatchStockAnalyzer
 """
 
 import yfinance as yf
+from yfinance.exceptions import YFRateLimitError
 import pandas as pd
 import numpy as np
-try:
-    from ta.trend import MACD, EMAIndicator, SMAIndicator
-    from ta.momentum import RSIIndicator, StochasticOscillator
-    from ta.volatility import BollingerBands, AverageTrueRange
-    from ta.volume import OnBalanceVolumeIndicator
-    TA_AVAILABLE = True
-except ImportError:
-    TA_AVAILABLE = False
-    print("Warning: ta library not available, using fallback calculations")
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta, date
+from typing import Dict, List, Optional, Tuple
 import time
 import random
 import warnings
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from operator import itemgetter
+from app.jit import njit, prange
+from app.logger import get_logger
+from app.modules.data_loader import download_looks_rate_limited, get_http_session
 warnings.filterwarnings('ignore')
 
+_log = get_logger()
+
+# Repeated errors of one category (e.g. a bad universe) log only every Nth occurrence
+ERROR_LOG_EVERY = 100
+_error_counts = Counter()
+_error_counts_lock = threading.Lock()
+
+
+def _log_error(category: str, **fields):
+    """Log the 1st, (N+1)th, (2N+1)th... error of a category along with its running count"""
+    with _error_counts_lock:
+        _error_counts[category] += 1
+        occurrences = _error_counts[category]
+    if (occurrences - 1) % ERROR_LOG_EVERY == 0:
+        _log.error(category, occurrences=occurrences, **fields)
+
+
+# Concurrency for network-bound batch downloads, per-symbol analysis and ticker.info lookups
+FETCH_WORKERS = 4
+ANALYSIS_WORKERS = 8
+INFO_WORKERS = 16
+
+# Yahoo serves at most 20 symbols per request; only a rate-limited batch triggers a backoff
+FETCH_BATCH_SIZE = 20
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF = 2.0
+
+# Process-wide memo of technical analyses keyed by (symbol, period, last bar ns, last close, last volume);
+# a new bar or a move in the live bar (same daily timestamp all session) changes the key
+ANALYSIS_CACHE_MAX_ENTRIES = 4096
+ANALYSIS_CACHE_MAX_AGE = 86400
+_analysis_cache: Dict[Tuple[str, str, int, float, float], Tuple[float, Dict]] = {}
+_analysis_cache_lock = threading.Lock()
+
+# Ticker info changes at most daily, so it is reused across engine instances for the same calendar day
+_info_cache: Dict[Tuple[str, date], Dict] = {}
+_info_cache_lock = threading.Lock()
+
+
+def _get_cached_analysis(key: Tuple[str, str, int, float, float]) -> Optional[Dict]:
+    """Return a memoized analysis, or None if absent/expired"""
+    with _analysis_cache_lock:
+        cached = _analysis_cache.get(key)
+    if cached and time.monotonic() - cached[0] < ANALYSIS_CACHE_MAX_AGE:
+        return cached[1]
+    return None
+
+
+def _store_cached_analysis(key: Tuple[str, str, int, float, float], analysis: Dict):
+    """Remember an analysis, pruning expired entries and the oldest ones past the size cap"""
+    now = time.monotonic()
+    with _analysis_cache_lock:
+        for stale in [k for k, (ts, _) in _analysis_cache.items() if now - ts > ANALYSIS_CACHE_MAX_AGE]:
+            del _analysis_cache[stale]
+        while len(_analysis_cache) >= ANALYSIS_CACHE_MAX_ENTRIES:
+            del _analysis_cache[next(iter(_analysis_cache))]
+        _analysis_cache[key] = (now, analysis)
+
+# Summary fields rounded for output, mapped to their source indicator keys
+_SUMMARY_INDICATOR_FIELDS = (
+    ('current_price', 'Current_Price'),
+    ('price_change_pct', 'Price_Change_Pct'),
+    ('price_change_1d_pct', 'Price_Change_1d_Pct'),
+    ('price_change_1w_pct', 'Price_Change_1w_Pct'),
+    ('price_change_1m_pct', 'Price_Change_1m_Pct'),
+    ('price_change_6m_pct', 'Price_Change_6m_Pct'),
+    ('price_change_1y_pct', 'Price_Change_1y_Pct'),
+    ('rsi', 'RSI'),
+    ('macd', 'MACD'),
+    ('macd_signal', 'MACD_Signal'),
+    ('sma_20', 'SMA_20'),
+    ('sma_50', 'SMA_50'),
+    ('sma_200', 'SMA_200'),
+    ('bb_upper', 'BB_Upper'),
+    ('bb_lower', 'BB_Lower'),
+)
+
+
+@njit(cache=True)
+def _trailing_indicators(close):
+    """
+    Last values of SMA 20/50/200, MACD(12, 26, 9), RSI(14) and Bollinger(20, 2) in one native pass
+    
+    EMAs follow pandas ewm(adjust=False) and RSI uses Wilder smoothing over the full
+    series, matching the ta library. Values with too little history are NaN.
+    """
+    n = close.size
+    nan = np.nan
+    
+    sma_20 = close[n - 20:].mean() if n >= 20 else nan
+    sma_50 = close[n - 50:].mean() if n >= 50 else nan
+    sma_200 = close[n - 200:].mean() if n >= 200 else nan
+    
+    bb_upper = nan
+    bb_lower = nan
+    if n >= 20:
+        dev = 2.0 * close[n - 20:].std()
+        bb_upper = sma_20 + dev
+        bb_lower = sma_20 - dev
+    
+    # Single recursion for both MACD EMAs, the signal line and RSI averages
+    a_fast, a_slow, a_sig, a_rsi = 2.0 / 13.0, 2.0 / 27.0, 2.0 / 10.0, 1.0 / 14.0
+    ema_fast = close[0]
+    ema_slow = close[0]
+    signal = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        price = close[i]
+        ema_fast = a_fast * price + (1.0 - a_fast) * ema_fast
+        ema_slow = a_slow * price + (1.0 - a_slow) * ema_slow
+        if i == 25:
+            signal = ema_fast - ema_slow
+        elif i > 25:
+            signal = a_sig * (ema_fast - ema_slow) + (1.0 - a_sig) * signal
+        
+        # Branchless gain/loss split; max(0.0, x) also maps a NaN delta to 0 like the comparisons did
+        delta = price - close[i - 1]
+        gain = max(0.0, delta)
+        loss = max(0.0, -delta)
+        avg_gain = a_rsi * gain + (1.0 - a_rsi) * avg_gain
+        avg_loss = a_rsi * loss + (1.0 - a_rsi) * avg_loss
+    
+    macd = ema_fast - ema_slow if n >= 26 else nan
+    macd_signal = signal if n >= 34 else nan
+    
+    rsi = nan
+    if n >= 14:
+        rsi = 100.0 if avg_loss == 0.0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    
+    return sma_20, sma_50, sma_200, macd, macd_signal, rsi, bb_upper, bb_lower
+
+
+@njit(parallel=True, nogil=True, cache=True)
+def _trailing_indicators_batch(close, bar_counts, out):
+    """
+    _trailing_indicators for every row of a right-aligned close matrix, rows spread across cores
+    
+    Row i uses its last bar_counts[i] closes; the eight results land in out[i].
+    """
+    width = close.shape[1]
+    for i in prange(close.shape[0]):
+        sma_20, sma_50, sma_200, macd, macd_signal, rsi, bb_upper, bb_lower = _trailing_indicators(
+            close[i, width - bar_counts[i]:])
+        out[i, 0] = sma_20
+        out[i, 1] = sma_50
+        out[i, 2] = sma_200
+        out[i, 3] = macd
+        out[i, 4] = macd_signal
+        out[i, 5] = rsi
+        out[i, 6] = bb_upper
+        out[i, 7] = bb_lower
+
+
+# Indicator keys in the order _trailing_indicators returns them
+_TRAILING_INDICATOR_KEYS = ('SMA_20', 'SMA_50', 'SMA_200', 'MACD', 'MACD_Signal', 'RSI', 'BB_Upper', 'BB_Lower')
+
+# Price fields computed for every symbol regardless of history length
+_CHANGE_INDICATOR_KEYS = ('Current_Price', 'Price_Change_Pct', 'Price_Change_1d_Pct', 'Price_Change_1w_Pct',
+                          'Price_Change_1m_Pct', 'Price_Change_6m_Pct', 'Price_Change_1y_Pct')
+
+# Scoring rules: each reason fires on a boolean condition and contributes its weight to the score
+_SCORE_REASONS = np.array([
+    "RSI oversold", "RSI favorable", "RSI overbought",
+    "MACD bullish", "MACD bearish",
+    "Above SMA 20", "Below SMA 20", "Above SMA 50", "Below SMA 50",
+    "Weekly gain", "Monthly gain",
+])
+_SCORE_WEIGHTS = np.array([2.0, 1.0, -2.0, 1.0, -1.0, 1.0, -1.0, 1.0, -1.0, 0.5, 0.5])
+
+
+def _build_result_row(symbol: str, summary: Dict, recommendation: Dict, timestamp: str) -> Dict:
+    """Build the recommendation row emitted for a symbol from its analysis summary"""
+    g = summary.get
+    rec_txt, score, reasoning = recommendation['recommendation'], recommendation['score'], recommendation['reasoning']
+    return {
+        'symbol': symbol,
+        'company': g('company_name', 'N/A'),
+        'price': g('current_price', 0),
+        'change_pct': g('price_change_pct', 0),
+        'rsi': g('rsi', 0),
+        'macd': g('macd', 0),
+        'sma_20': g('sma_20', 0),
+        'sma_50': g('sma_50', 0),
+        'recommendation': rec_txt,
+        'score': score,
+        'reasoning': reasoning,
+        'target_price': g('target_price', 0),
+        'stop_loss': g('stop_loss', 0),
+        'fundamental': g('fundamental', {}),
+        'timestamp': timestamp
+    }
+
 
 class StockRecommendationEngine:
     """Core recommendation engine for stock analysis"""
@@ -29,7 +222,15 @@ class StockRecommendationEngine:
         self.symbols = [s.upper().strip() for s in symbols if s.strip()]
         self.period = period if period != "1y" else "6mo"
         self.data_cache = {}
-        self.ticker_cache = {}
+        self.info_cache = {}
+        self._cache_lock = threading.Lock()
+        
+        # Structure-of-arrays price layout: one right-aligned, NaN-padded close row per symbol
+        self.symbol_rows = {}
+        self.close_matrix = np.empty((0, 0), dtype=np.float64)
+        self.bar_counts = np.empty(0, dtype=np.int64)
+        self.indicator_cache = {}
+        self.recommendation_cache = {}
     
     def fetch_all_data(self) -> Dict[str, bool]:
         """Fetch data for all symbols"""
@@ -41,17 +242,11 @@ class StockRecommendationEngine:
         if not uncached_symbols:
             return {symbol: True for symbol in self.symbols}
         
-        # Process in batches to avoid rate limits
-        batch_size = 50
-        for i in range(0, len(uncached_symbols), batch_size):
-            batch_symbols = uncached_symbols[i:i + batch_size]
-            batch_results = self._fetch_batch(batch_symbols)
-            results.update(batch_results)
-            
-            # Add delay between batches
-            if i + batch_size < len(uncached_symbols):
-                delay = random.uniform(1.0, 2.0)
-                time.sleep(delay)
+        # Process in server-sized batches, a few batches in flight at once
+        batches = [uncached_symbols[i:i + FETCH_BATCH_SIZE] for i in range(0, len(uncached_symbols), FETCH_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(batches))) as executor:
+            for batch_results in executor.map(self._fetch_batch, batches):
+                results.update(batch_results)
         
         # Add cached symbols
         for symbol in self.symbols:
@@ -60,20 +255,106 @@ class StockRecommendationEngine:
         
         return results
     
+    def _build_price_matrix(self, symbols: List[str]):
+        """
+        Stack the cached close series of symbols into one row-per-symbol float64 matrix
+        
+        Callers hold _cache_lock through this and the _analyze_batch that follows, so readers
+        never see the new symbol_rows paired with the previous batch's caches.
+        """
+        closes = [self.data_cache[s]['Close'].to_numpy(dtype=np.float64) for s in symbols]
+        bar_counts = np.fromiter((c.size for c in closes), dtype=np.int64, count=len(closes))
+        width = int(bar_counts.max()) if closes else 0
+        
+        close_matrix = np.full((len(closes), width), np.nan)
+        for row, close in enumerate(closes):
+            if close.size:
+                close_matrix[row, width - close.size:] = close
+        
+        self.symbol_rows = {symbol: row for row, symbol in enumerate(symbols)}
+        self.close_matrix = close_matrix
+        self.bar_counts = bar_counts
+    
+    def _load_info(self, symbol: str) -> Dict:
+        """Fetch and cache a symbol's info dict, falling back to fast_info when info is sparse"""
+        cached = self.info_cache.get(symbol)
+        if cached is not None:
+            return cached
+        
+        day_key = (symbol, date.today())
+        with _info_cache_lock:
+            cached = _info_cache.get(day_key)
+        if cached is not None:
+            self.info_cache[symbol] = cached
+            return cached
+        
+        # Built on demand over the shared pooled session; a Ticker caches nothing across .info calls
+        ticker = yf.Ticker(symbol, session=get_http_session())
+        try:
+            info = dict(ticker.info or {})
+            if len(info) < 5:
+                try:
+                    fast_info = ticker.fast_info
+                    if fast_info and isinstance(fast_info, dict):
+                        info.update(fast_info)
+                except:
+                    pass
+        except Exception:
+            try:
+                info = dict(ticker.fast_info or {})
+            except:
+                info = {}
+        
+        self.info_cache[symbol] = info
+        if info:
+            with _info_cache_lock:
+                for stale in [k for k in _info_cache if k[1] != day_key[1]]:
+                    del _info_cache[stale]
+                _info_cache[day_key] = info
+        return info
+    
+    def _analysis_key(self, symbol: str) -> Optional[Tuple[str, str, int, float, float]]:
+        """
+        Memo key for a symbol's analysis: identical period and last bar mean identical indicators
+        
+        A daily bar keeps its timestamp all session while its close and volume move, so those
+        are part of the key; earlier bars are settled and the period fixes where the window starts.
+        """
+        data = self.data_cache.get(symbol)
+        if data is None or data.empty:
+            return None
+        return (symbol, self.period, pd.Timestamp(data.index[-1]).value,
+                float(data['Close'].iat[-1]), float(data['Volume'].iat[-1]))
+    
+    def _download_batch(self, symbols: List[str]) -> pd.DataFrame:
+        """Download a batch, backing off with jitter and retrying only when Yahoo rate-limits it"""
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            try:
+                data = yf.download(
+                    symbols,
+                    period=self.period,
+                    group_by='ticker',
+                    auto_adjust=True,
+                    prepost=False,
+                    threads=True,
+                    timeout=30
+                )
+            except YFRateLimitError:
+                if attempt == RATE_LIMIT_RETRIES:
+                    raise
+                data = None
+            else:
+                # A 429 inside yf.download surfaces only as a batch with no prices at all
+                if not download_looks_rate_limited(data, symbols) or attempt == RATE_LIMIT_RETRIES:
+                    return data
+            time.sleep(RATE_LIMIT_BACKOFF * 2 ** attempt + random.uniform(0.0, 1.0))
+    
     def _fetch_batch(self, symbols: List[str]) -> Dict[str, bool]:
         """Fetch data for a batch of symbols"""
         results = {}
         
         try:
-            data = yf.download(
-                symbols,
-                period=self.period,
-                group_by='ticker',
-                auto_adjust=True,
-                prepost=False,
-                threads=True,
-                timeout=30
-            )
+            data = self._download_batch(symbols)
             
             # Handle single symbol case
             if len(symbols) == 1:
@@ -83,8 +364,8 @@ class StockRecommendationEngine:
                         data.columns = [col[1] for col in data.columns]
                     
                     if all(col in data.columns for col in ['Close', 'High', 'Low', 'Volume']):
-                        self.data_cache[symbol] = data
-                        self.ticker_cache[symbol] = yf.Ticker(symbol)
+                        with self._cache_lock:
+                            self.data_cache[symbol] = data
                         results[symbol] = True
                     else:
                         results[symbol] = False
@@ -100,8 +381,8 @@ class StockRecommendationEngine:
                         
                         if not symbol_data.empty and len(symbol_data) >= 14:
                             if all(col in symbol_data.columns for col in ['Close', 'High', 'Low', 'Volume']):
-                                self.data_cache[symbol] = symbol_data
-                                self.ticker_cache[symbol] = yf.Ticker(symbol)
+                                with self._cache_lock:
+                                    self.data_cache[symbol] = symbol_data
                                 results[symbol] = True
                             else:
                                 results[symbol] = False
@@ -111,11 +392,11 @@ class StockRecommendationEngine:
                         results[symbol] = False
                         
                 except Exception as e:
-                    print(f"Error processing {symbol}: {str(e)}")
+                    _log_error("fetch_symbol_error", symbol=symbol, error=str(e))
                     results[symbol] = False
                     
         except Exception as e:
-            print(f"Error fetching batch data: {str(e)}")
+            _log_error("fetch_batch_error", symbols=len(symbols), error=str(e))
             for symbol in symbols:
                 results[symbol] = False
         
@@ -123,64 +404,80 @@ class StockRecommendationEngine:
     
     def analyze_symbol(self, symbol: str) -> Optional[Dict]:
         """Analyze a single symbol"""
+        analysis = self._analyze_technical(symbol)
+        if not analysis or 'error' in analysis:
+            return analysis
+        return self._with_fundamentals(analysis, *self._fetch_fundamentals(symbol))
+    
+    def _analyze_technical(self, symbol: str) -> Optional[Dict]:
+        """Indicators, recommendation and price targets for a symbol, without any network lookups"""
         if symbol not in self.data_cache:
             return None
         
         try:
             data = self.data_cache[symbol]
-            ticker = self.ticker_cache.get(symbol)
             
             if data is None or data.empty or len(data) < 2:
                 return {'error': 'Insufficient data for analysis'}
             
-            # Calculate indicators
-            indicators = self._calculate_indicators(data)
-            if not indicators:
-                return {'error': 'Failed to calculate indicators'}
-            
-            # Get fundamental data
-            fundamental = self._get_fundamental_data(ticker)
+            key = self._analysis_key(symbol)
+            cached = _get_cached_analysis(key)
+            if cached is not None:
+                return cached
             
-            # Get recommendation
-            recommendation = self._get_recommendation(indicators)
+            # Indicators come precomputed from the batch pass; build the matrix on demand for one-off calls.
+            # Reads share the lock with the rebuild so they never catch it half-published
+            with self._cache_lock:
+                if symbol not in self.symbol_rows:
+                    self._build_price_matrix([s for s in self.symbols if s in self.data_cache])
+                    self._analyze_batch()
+                indicators = self.indicator_cache.get(symbol)
+                # Recommendation was scored with the rest of the batch
+                recommendation = self.recommendation_cache.get(symbol)
+            if not indicators or recommendation is None:
+                return {'error': 'Failed to calculate indicators'}
             
             # Calculate target and stop loss prices based on recommendation
             target_price, stop_loss = self._calculate_price_targets(indicators, recommendation['recommendation'])
             
-            # Create summary
-            summary = {
-                'symbol': symbol,
-                'company_name': ticker.info.get('longName', 'N/A') if ticker and hasattr(ticker, 'info') else 'N/A',
-                'current_price': round(indicators.get('Current_Price', 0), 2),
-                'price_change_pct': round(indicators.get('Price_Change_Pct', 0), 2),
-                'price_change_1d_pct': round(indicators.get('Price_Change_1d_Pct', 0), 2),
-                'price_change_1w_pct': round(indicators.get('Price_Change_1w_Pct', 0), 2),
-                'price_change_1m_pct': round(indicators.get('Price_Change_1m_Pct', 0), 2),
-                'price_change_6m_pct': round(indicators.get('Price_Change_6m_Pct', 0), 2),
-                'price_change_1y_pct': round(indicators.get('Price_Change_1y_Pct', 0), 2),
-                'rsi': round(indicators.get('RSI', 0), 2) if indicators.get('RSI') is not None else 0,
-                'macd': round(indicators.get('MACD', 0), 2) if indicators.get('MACD') is not None else 0,
-                'macd_signal': round(indicators.get('MACD_Signal', 0), 2) if indicators.get('MACD_Signal') is not None else 0,
-                'sma_20': round(indicators.get('SMA_20', 0), 2) if indicators.get('SMA_20') is not None else 0,
-                'sma_50': round(indicators.get('SMA_50', 0), 2) if indicators.get('SMA_50') is not None else 0,
-                'sma_200': round(indicators.get('SMA_200', 0), 2) if indicators.get('SMA_200') is not None else 0,
-                'bb_upper': round(indicators.get('BB_Upper', 0), 2) if indicators.get('BB_Upper') is not None else 0,
-                'bb_lower': round(indicators.get('BB_Lower', 0), 2) if indicators.get('BB_Lower') is not None else 0,
-                'target_price': round(target_price, 2),
-                'stop_loss': round(stop_loss, 2),
-                'fundamental': fundamental
-            }
+            # Round all numeric summary fields with builtin round (missing values -> 0)
+            rounded = [
+                round(float(value), 2)
+                for value in chain((indicators.get(key) or 0.0 for _, key in _SUMMARY_INDICATOR_FIELDS), (target_price, stop_loss))
+            ]
             
-            return {
+            # Create summary; company name and fundamentals are merged in afterwards
+            summary = {'symbol': symbol}
+            summary.update(zip((name for name, _ in _SUMMARY_INDICATOR_FIELDS), rounded))
+            summary['target_price'] = rounded[-2]
+            summary['stop_loss'] = rounded[-1]
+            
+            analysis = {
                 'summary': summary,
                 'recommendation': recommendation,
                 'indicators': indicators
             }
+            _store_cached_analysis(key, analysis)
+            return analysis
             
         except Exception as e:
-            print(f"Error analyzing {symbol}: {str(e)}")
+            _log_error("analysis_error", symbol=symbol, error=str(e))
             return {'error': f'Analysis failed: {str(e)}'}
     
+    def _fetch_fundamentals(self, symbol: str) -> Tuple[str, Dict]:
+        """Company name and fundamental data for a symbol (one info lookup, cached per day)"""
+        info = self._load_info(symbol)
+        return info.get('longName', 'N/A'), self._get_fundamental_data(info)
+    
+    @staticmethod
+    def _with_fundamentals(analysis: Dict, company_name: str, fundamental: Dict) -> Dict:
+        """Copy of a technical analysis with company name and fundamentals merged into its summary"""
+        summary = analysis['summary']
+        merged = {'symbol': summary['symbol'], 'company_name': company_name}
+        merged.update(summary)
+        merged['fundamental'] = fundamental
+        return {**analysis, 'summary': merged}
+    
     def analyze_all(self) -> List[Dict]:
         """Analyze all symbols and return recommendations"""
         recommendations = []
@@ -188,164 +485,117 @@ class StockRecommendationEngine:
         # Fetch all data
         fetch_results = self.fetch_all_data()
         
-        # Analyze each successful symbol
-        for symbol in self.symbols:
-            if fetch_results.get(symbol, False):
-                analysis = self.analyze_symbol(symbol)
-                if analysis and 'error' not in analysis:
-                    summary = analysis['summary']
-                    recommendation = analysis['recommendation']
-                    
-                    # Only include BUY recommendations for daily runs
-                    if 'BUY' in recommendation['recommendation']:
-                        recommendations.append({
-                            'symbol': symbol,
-                            'company': summary.get('company_name', 'N/A'),
-                            'price': summary.get('current_price', 0),
-                            'change_pct': summary.get('price_change_pct', 0),
-                            'rsi': summary.get('rsi', 0),
-                            'macd': summary.get('macd', 0),
-                            'sma_20': summary.get('sma_20', 0),
-                            'sma_50': summary.get('sma_50', 0),
-                            'recommendation': recommendation['recommendation'],
-                            'score': recommendation['score'],
-                            'reasoning': recommendation['reasoning'],
-                            'target_price': summary.get('target_price', 0),
-                            'stop_loss': summary.get('stop_loss', 0),
-                            'fundamental': summary.get('fundamental', {}),
-                            'timestamp': datetime.utcnow().isoformat()
-                        })
+        # Analyze each successful symbol concurrently (results keep symbol order)
+        fetched = [symbol for symbol in self.symbols if fetch_results.get(symbol, False)]
+        if not fetched:
+            return recommendations
+        
+        # All indicators for the not-yet-memoized symbols in one pass over the price matrix
+        uncached = [symbol for symbol in fetched if _get_cached_analysis(self._analysis_key(symbol)) is None]
+        with self._cache_lock:
+            self._build_price_matrix(uncached)
+            self._analyze_batch()
+        
+        with ThreadPoolExecutor(max_workers=min(ANALYSIS_WORKERS, len(fetched))) as executor:
+            analyses = list(executor.map(self._analyze_technical, fetched))
+        
+        # Only BUY recommendations are kept for daily runs, so only those need fundamentals
+        buys = [
+            (symbol, analysis) for symbol, analysis in zip(fetched, analyses)
+            if analysis and 'error' not in analysis and 'BUY' in analysis['recommendation']['recommendation']
+        ]
+        if not buys:
+            return recommendations
+        
+        with ThreadPoolExecutor(max_workers=min(INFO_WORKERS, len(buys))) as executor:
+            fundamentals = list(executor.map(self._fetch_fundamentals, [symbol for symbol, _ in buys]))
+        
+        # One timestamp for the whole run
+        timestamp = datetime.utcnow().isoformat()
+        for (symbol, analysis), (company_name, fundamental) in zip(buys, fundamentals):
+            analysis = self._with_fundamentals(analysis, company_name, fundamental)
+            recommendations.append(_build_result_row(symbol, analysis['summary'], analysis['recommendation'], timestamp))
         
         # Sort by score (highest first)
-        recommendations.sort(key=lambda x: x['score'], reverse=True)
+        recommendations.sort(key=itemgetter('score'), reverse=True)
         
         return recommendations
     
-    def _calculate_indicators(self, data: pd.DataFrame) -> Dict:
-        """Calculate technical indicators"""
-        indicators = {}
+    def _analyze_batch(self):
+        """Indicators and recommendations for every symbol in the price matrix"""
+        columns = self._calculate_indicators_batch()
+        scores, recommendations, reasons = self._get_recommendations_batch(columns)
         
-        try:
-            # Price data
-            indicators['Current_Price'] = data['Close'].iloc[-1]
-            
-            # Price changes
-            if len(data) >= 2:
-                prev_close = data['Close'].iloc[-2]
-                indicators['Price_Change_Pct'] = ((data['Close'].iloc[-1] - prev_close) / prev_close) * 100
-            else:
-                indicators['Price_Change_Pct'] = 0
-            
-            indicators['Price_Change_1d_Pct'] = indicators['Price_Change_Pct']
-            
-            # Different period changes
-            if len(data) >= 6:
-                week_ago_close = data['Close'].iloc[-6]
-                indicators['Price_Change_1w_Pct'] = ((data['Close'].iloc[-1] - week_ago_close) / week_ago_close) * 100
-            else:
-                indicators['Price_Change_1w_Pct'] = 0
-                
-            if len(data) >= 22:
-                month_ago_close = data['Close'].iloc[-22]
-                indicators['Price_Change_1m_Pct'] = ((data['Close'].iloc[-1] - month_ago_close) / month_ago_close) * 100
-            else:
-                indicators['Price_Change_1m_Pct'] = 0
-                
-            if len(data) >= 126:
-                six_months_ago_close = data['Close'].iloc[-127]
-                indicators['Price_Change_6m_Pct'] = ((data['Close'].iloc[-1] - six_months_ago_close) / six_months_ago_close) * 100
-            else:
-                indicators['Price_Change_6m_Pct'] = 0
-                
-            if len(data) >= 253:
-                year_ago_close = data['Close'].iloc[-253]
-                indicators['Price_Change_1y_Pct'] = ((data['Close'].iloc[-1] - year_ago_close) / year_ago_close) * 100
-            elif len(data) >= 50:
-                earliest_close = data['Close'].iloc[0]
-                days_available = len(data)
-                annualized_change = ((data['Close'].iloc[-1] - earliest_close) / earliest_close) * 100
-                indicators['Price_Change_1y_Pct'] = annualized_change * (252 / days_available)
-            else:
-                indicators['Price_Change_1y_Pct'] = 0
-            
-            # Moving Averages
-            if len(data) >= 20:
-                sma_20 = SMAIndicator(close=data['Close'], window=20)
-                sma_20_series = sma_20.sma_indicator()
-                indicators['SMA_20'] = sma_20_series.iloc[-1] if len(sma_20_series.dropna()) > 0 else None
-            else:
-                indicators['SMA_20'] = None
-                
-            if len(data) >= 50:
-                sma_50 = SMAIndicator(close=data['Close'], window=50)
-                sma_50_series = sma_50.sma_indicator()
-                indicators['SMA_50'] = sma_50_series.iloc[-1] if len(sma_50_series.dropna()) > 0 else None
-            else:
-                indicators['SMA_50'] = None
-                
-            if len(data) >= 200:
-                sma_200 = SMAIndicator(close=data['Close'], window=200)
-                sma_200_series = sma_200.sma_indicator()
-                indicators['SMA_200'] = sma_200_series.iloc[-1] if len(sma_200_series.dropna()) > 0 else None
-            else:
-                indicators['SMA_200'] = None
-            
-            # MACD
-            if len(data) >= 26:
-                macd = MACD(close=data['Close'])
-                macd_series = macd.macd()
-                macd_signal_series = macd.macd_signal()
-                
-                indicators['MACD'] = macd_series.iloc[-1] if len(macd_series.dropna()) > 0 else None
-                indicators['MACD_Signal'] = macd_signal_series.iloc[-1] if len(macd_signal_series.dropna()) > 0 else None
-            else:
-                indicators['MACD'] = None
-                indicators['MACD_Signal'] = None
-            
-            # RSI
-            rsi = RSIIndicator(close=data['Close'], window=14)
-            rsi_series = rsi.rsi()
-            indicators['RSI'] = rsi_series.iloc[-1] if len(rsi_series.dropna()) > 0 else None
-            
-            # Bollinger Bands
-            if len(data) >= 20:
-                bb = BollingerBands(close=data['Close'], window=20, window_dev=2)
-                bb_upper_series = bb.bollinger_hband()
-                bb_lower_series = bb.bollinger_lband()
-                
-                indicators['BB_Upper'] = bb_upper_series.iloc[-1] if len(bb_upper_series.dropna()) > 0 else None
-                indicators['BB_Lower'] = bb_lower_series.iloc[-1] if len(bb_lower_series.dropna()) > 0 else None
-            else:
-                indicators['BB_Upper'] = None
-                indicators['BB_Lower'] = None
-            
-        except Exception as e:
-            print(f"Error calculating indicators: {str(e)}")
+        # Change fields are always numeric; trailing indicators are None when there is not enough history
+        rows = zip(*(columns[key].tolist() for key in _CHANGE_INDICATOR_KEYS + _TRAILING_INDICATOR_KEYS))
+        indicator_cache = {}
+        recommendation_cache = {}
+        for symbol, values, score, recommendation, fired in zip(
+                self.symbol_rows, rows, scores.tolist(), recommendations.tolist(), reasons):
+            indicators = dict(zip(_CHANGE_INDICATOR_KEYS, values))
+            for key, value in zip(_TRAILING_INDICATOR_KEYS, values[len(_CHANGE_INDICATOR_KEYS):]):
+                indicators[key] = None if value != value else value
+            indicator_cache[symbol] = indicators
+            recommendation_cache[symbol] = {
+                'recommendation': recommendation,
+                'score': score,
+                'reasoning': '; '.join(_SCORE_REASONS[fired]) if fired.any() else "Neutral"
+            }
+        
+        self.indicator_cache = indicator_cache
+        self.recommendation_cache = recommendation_cache
+    
+    def _calculate_indicators_batch(self) -> Dict[str, np.ndarray]:
+        """Calculate technical indicators for every row of the price matrix, one array per indicator in row order"""
+        close = self.close_matrix
+        n = self.bar_counts
+        width = close.shape[1]
+        rows = np.arange(close.shape[0])
+        last = close[:, -1] if width else np.empty(0)
         
-        return indicators
+        def change_pct(lookback, min_bars):
+            """Percent change of the last close over close[-lookback], 0 where history is short"""
+            if width < lookback:
+                return np.zeros_like(last)
+            prev = close[:, -lookback]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pct = ((last - prev) / prev) * 100
+            return np.where(n >= min_bars, pct, 0.0)
+        
+        change_1d = change_pct(2, 2)
+        
+        # 1y change, or the available history annualized when there are at least 50 bars; the
+        # longest row (the matrix width) decides once whether either branch can apply at all
+        if width >= 50:
+            first = close[rows, width - n]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                annualized = ((last - first) / first) * 100 * (252 / n)
+            change_1y = np.where(n >= 253, change_pct(253, 253), np.where(n >= 50, annualized, 0.0))
+        else:
+            change_1y = np.zeros_like(last)
+        
+        # Trailing indicators from one parallel JIT kernel over each row's own bars; NaN means not enough history
+        trailing = np.empty((close.shape[0], len(_TRAILING_INDICATOR_KEYS)))
+        _trailing_indicators_batch(close, n, trailing)
+        
+        columns = {
+            'Current_Price': last,
+            'Price_Change_Pct': change_1d,
+            'Price_Change_1d_Pct': change_1d,
+            'Price_Change_1w_Pct': change_pct(6, 6),
+            'Price_Change_1m_Pct': change_pct(22, 22),
+            'Price_Change_6m_Pct': change_pct(127, 127),
+            'Price_Change_1y_Pct': change_1y,
+        }
+        columns.update(zip(_TRAILING_INDICATOR_KEYS, trailing.T))
+        return columns
     
-    def _get_fundamental_data(self, ticker) -> Dict:
-        """Get fundamental analysis data"""
-        if not ticker:
+    def _get_fundamental_data(self, info: Dict) -> Dict:
+        """Get fundamental analysis data from a prefetched info dict"""
+        if not info:
             return {}
         
         try:
-            info = {}
-            try:
-                info = ticker.info
-                if not info or (isinstance(info, dict) and len(info) < 5):
-                    try:
-                        fast_info = ticker.fast_info
-                        if fast_info and isinstance(fast_info, dict):
-                            info.update(fast_info)
-                    except:
-                        pass
-            except Exception:
-                try:
-                    info = ticker.fast_info or {}
-                except:
-                    info = {}
-            
             def safe_get(keys, default='N/A'):
                 if isinstance(keys, str):
                     keys = [keys]
@@ -383,89 +633,66 @@ class StockRecommendationEngine:
             }
             
         except Exception as e:
-            print(f"Error getting fundamental data: {str(e)}")
+            _log_error("fundamental_data_error", error=str(e))
             return {}
     
     def _get_recommendation(self, indicators: Dict) -> Dict:
         """Generate buy/sell/hold recommendation"""
-        score = 0
-        reasoning = []
-        
-        # RSI analysis
-        rsi = indicators.get('RSI')
-        if rsi is not None:
-            if rsi < 30:
-                score += 2
-                reasoning.append("RSI oversold")
-            elif rsi < 50:
-                score += 1
-                reasoning.append("RSI favorable")
-            elif rsi > 70:
-                score -= 2
-                reasoning.append("RSI overbought")
-        
-        # MACD analysis
-        macd = indicators.get('MACD')
-        macd_signal = indicators.get('MACD_Signal')
-        if macd is not None and macd_signal is not None:
-            if macd > macd_signal:
-                score += 1
-                reasoning.append("MACD bullish")
-            else:
-                score -= 1
-                reasoning.append("MACD bearish")
-        
-        # Moving average analysis
-        sma_20 = indicators.get('SMA_20')
-        sma_50 = indicators.get('SMA_50')
-        current_price = indicators.get('Current_Price')
-        
-        if current_price and sma_20:
-            if current_price > sma_20:
-                score += 1
-                reasoning.append("Above SMA 20")
-            else:
-                score -= 1
-                reasoning.append("Below SMA 20")
-        
-        if current_price and sma_50:
-            if current_price > sma_50:
-                score += 1
-                reasoning.append("Above SMA 50")
-            else:
-                score -= 1
-                reasoning.append("Below SMA 50")
-        
-        # Price momentum
-        price_change_1w = indicators.get('Price_Change_1w_Pct', 0)
-        price_change_1m = indicators.get('Price_Change_1m_Pct', 0)
-        
-        if price_change_1w > 0:
-            score += 0.5
-            reasoning.append("Weekly gain")
-        
-        if price_change_1m > 0:
-            score += 0.5
-            reasoning.append("Monthly gain")
-        
-        # Determine recommendation
-        if score >= 3:
-            recommendation = "STRONG_BUY"
-        elif score >= 1:
-            recommendation = "BUY"
-        elif score <= -3:
-            recommendation = "STRONG_SELL"
-        elif score <= -1:
-            recommendation = "SELL"
-        else:
-            recommendation = "HOLD"
+        columns = {
+            key: np.array([np.nan if indicators.get(key) is None else indicators[key]], dtype=np.float64)
+            for key in ('RSI', 'MACD', 'MACD_Signal', 'SMA_20', 'SMA_50', 'Current_Price')
+        }
+        for key in ('Price_Change_1w_Pct', 'Price_Change_1m_Pct'):
+            columns[key] = np.array([indicators.get(key, 0)], dtype=np.float64)
         
+        scores, recommendations, reasons = self._get_recommendations_batch(columns)
         return {
-            'recommendation': recommendation,
-            'score': score,
-            'reasoning': '; '.join(reasoning) if reasoning else "Neutral"
+            'recommendation': recommendations[0],
+            'score': scores[0].item(),
+            'reasoning': '; '.join(_SCORE_REASONS[reasons[0]]) if reasons[0].any() else "Neutral"
         }
     
+    @staticmethod
+    def _get_recommendations_batch(columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score every row of indicator columns at once
+        
+        Missing indicators are NaN and never fire a rule. Returns the scores, the
+        recommendation labels and a boolean matrix of fired _SCORE_REASONS per row.
+        """
+        rsi, macd, macd_signal = columns['RSI'], columns['MACD'], columns['MACD_Signal']
+        sma_20, sma_50, price = columns['SMA_20'], columns['SMA_50'], columns['Current_Price']
+        
+        has_macd = ~np.isnan(macd) & ~np.isnan(macd_signal)
+        macd_bullish = macd > macd_signal
+        # A zero/missing price or SMA skips the comparison, like the truthiness checks it replaces
+        has_sma_20 = (price != 0) & (sma_20 != 0) & ~np.isnan(sma_20)
+        has_sma_50 = (price != 0) & (sma_50 != 0) & ~np.isnan(sma_50)
+        above_20 = price > sma_20
+        above_50 = price > sma_50
+        
+        fired = np.column_stack((
+            rsi < 30,
+            (rsi >= 30) & (rsi < 50),
+            rsi > 70,
+            has_macd & macd_bullish,
+            has_macd & ~macd_bullish,
+            has_sma_20 & above_20,
+            has_sma_20 & ~above_20,
+            has_sma_50 & above_50,
+            has_sma_50 & ~above_50,
+            columns['Price_Change_1w_Pct'] > 0,
+            columns['Price_Change_1m_Pct'] > 0,
+        ))
+        scores = fired @ _SCORE_WEIGHTS
+        
+        recommendations = np.select(
+            (scores >= 3, scores >= 1, scores <= -3, scores <= -1),
+            ("STRONG_BUY", "BUY", "STRONG_SELL", "SELL"),
+            default="HOLD",
+        ).astype(object)
+        return scores, recommendations, fired
+    
     def _calculate_price_targets(self, indicators: Dict, recommendation: str) -> tuple:
         """
         Calculate target price and stop loss based on recommendation
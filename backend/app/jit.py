@@ -0,0 +1,25 @@
+"""
+Optional Numba JIT support - kernels run as plain Python/NumPy when numba is unavailable
+"""
+
+import os
+
+# Lambda's code directory is read-only; keep cache=True kernels writable under /tmp
+if os.getenv('AWS_LAMBDA_FUNCTION_NAME'):
+    os.environ.setdefault('NUMBA_CACHE_DIR', '/tmp/numba_cache')
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit supporting both @njit and @njit(...)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
@@ -0,0 +1,52 @@
+"""
+JSON serialization helpers backed by orjson
+"""
+
+import sys
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# numpy scalars/arrays are written straight from their buffers, no .item()/.tolist() walk
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Exact-type converters for values orjson hands back to the default hook
+_DEFAULT_DISPATCH = {
+    Decimal: float,
+}
+
+
+def _default(obj):
+    """Fallback for types orjson cannot serialize natively"""
+    convert = _DEFAULT_DISPATCH.get(type(obj))
+    if convert is not None:
+        return convert(obj)
+    # A numpy value can only get here if numpy is already loaded, so it is never imported for this
+    np = sys.modules.get('numpy')
+    if np is not None:
+        if isinstance(obj, np.ndarray):  # non-contiguous or unsupported dtype
+            return obj.tolist()
+        if isinstance(obj, np.floating):  # float16/longdouble, which orjson skips
+            return float(obj)
+        if isinstance(obj, np.generic):  # any other numpy scalar
+            return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Serialize obj to JSON bytes, optionally pretty-printed with 2-space indent"""
+    option = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    return orjson.dumps(obj, default=_default, option=option)
+
+
+def loads(data):
+    """Parse JSON from bytes/str with orjson; raises orjson.JSONDecodeError (a ValueError)"""
+    return orjson.loads(data)
+
+
+class NumpyORJSONResponse(ORJSONResponse):
+    """JSON response rendered with orjson, including numpy types"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
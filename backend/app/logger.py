@@ -3,16 +3,22 @@ Cost-optimized logging configuration for CloudWatch
 """
 
 import logging
-import json
 import os
 from datetime import datetime
 from typing import Dict, Any
 
+from app.json_utils import dumps
+
 class CostOptimizedLogger:
     """Structured logger with cost optimization features"""
     
     def __init__(self, name: str = "stock-analyzer"):
         self.logger = logging.getLogger(name)
+        
+        # Environment fields are fixed for the life of the process
+        self.lambda_function = os.getenv('AWS_LAMBDA_FUNCTION_NAME')
+        self.environment = 'aws' if self.lambda_function else 'local'
+        self.verbose = os.getenv('ENABLE_VERBOSE_LOGGING', 'false').lower() == 'true'
         self._setup_logger()
         
     def _setup_logger(self):
@@ -21,7 +27,7 @@ class CostOptimizedLogger:
             return
             
         # Auto-detect environment and set appropriate log level
-        if os.getenv('AWS_LAMBDA_FUNCTION_NAME'):
+        if self.lambda_function:
             # AWS Lambda environment - use WARNING to minimize costs
             log_level = os.getenv('LOG_LEVEL', 'WARNING').upper()
         else:
@@ -44,8 +50,8 @@ class CostOptimizedLogger:
     def _should_log(self, level: str) -> bool:
         """Check if message should be logged based on environment and level"""
         # In AWS Lambda, only log WARNING and above unless explicitly enabled
-        if os.getenv('AWS_LAMBDA_FUNCTION_NAME') and level in ['DEBUG', 'INFO']:
-            return os.getenv('ENABLE_VERBOSE_LOGGING', 'false').lower() == 'true'
+        if self.lambda_function and level in ('DEBUG', 'INFO'):
+            return self.verbose
         return True
         
     def _log_structured(self, level: str, message: str, **kwargs):
@@ -58,13 +64,13 @@ class CostOptimizedLogger:
             'timestamp': datetime.utcnow().isoformat(),
             'level': level,
             'message': message,
-            'environment': 'aws' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'local',
-            'lambda_function': os.getenv('AWS_LAMBDA_FUNCTION_NAME', 'local'),
+            'environment': self.environment,
+            'lambda_function': self.lambda_function or 'local',
             **kwargs
         }
         
         # Log the structured message
-        getattr(self.logger, level.lower())(json.dumps(log_data))
+        getattr(self.logger, level.lower())(dumps(log_data).decode())
         
     def debug(self, message: str, **kwargs):
         """Debug level logging"""
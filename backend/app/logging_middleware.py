@@ -2,8 +2,9 @@
 Cost-optimized logging middleware for FastAPI
 """
 
+import re
 import time
-import json
+import logging
 from typing import Callable
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -16,16 +17,22 @@ class CostOptimizedLoggingMiddleware(BaseHTTPMiddleware):
     
     def __init__(self, app, exclude_paths: list = None):
         super().__init__(app)
-        self.exclude_paths = exclude_paths or [
+        self.exclude_paths = frozenset(exclude_paths or (
             "/health",  # Exclude health checks from detailed logging
             "/metrics",  # Exclude metrics endpoints
             "/history/dates",  # Exclude frequently polled endpoints
             "/config"  # Exclude config endpoints
-        ]
+        ))
+        # One anchored pattern also covers sub-paths such as /config/symbols
+        self._exclude_re = re.compile(
+            '(?:%s)(?:/|$)' % '|'.join(re.escape(path.rstrip('/')) for path in sorted(self.exclude_paths))
+        )
+        # API call logs are INFO; when that level is suppressed (Lambda default) there is nothing to time
+        self._info_enabled = logger._should_log('INFO') and logger.logger.isEnabledFor(logging.INFO)
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # Skip all processing for health checks to minimize Lambda execution time
-        if request.url.path in self.exclude_paths:
+        if not self._info_enabled or self._exclude_re.match(request.url.path):
             return await call_next(request)
         
         start_time = time.time()
@@ -2,17 +2,15 @@
 Lambda entry point with FastAPI and EventBridge support
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from mangum import Mangum
 from typing import List, Dict, Any
+from functools import lru_cache
 import os
-import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
-from datetime import datetime
-
-# Import analysis engine
-from app.engine.modular_recommender import run_modular_analysis, run_single_analysis
 
 from app.services.s3_store import persist_results
 from app.services.pushover import send_push_notification
@@ -22,10 +20,62 @@ from app.services.config_manager import (
 )
 from app.logging_middleware import CostOptimizedLoggingMiddleware, StructuredErrorLoggingMiddleware
 from app.simple_auth import verify_api_key
+from app.health import HealthShortcutMiddleware
 from app.logger import get_logger
+from app.json_utils import NumpyORJSONResponse, dumps
+from app.clock import utc_now_iso
+from app.config import BATCH_WORKERS, BATCH_TIMEOUT, ENABLE_RECON_API, ENABLE_SYMBOL_ANALYSIS_API, IS_LAMBDA, LAMBDA_ROLE
 
 logger = get_logger()
 
+
+# The analysis engine pulls in pandas, numpy and yfinance (most of the import time), so it is only
+# loaded by the first request or cron run that actually analyzes something
+def run_modular_analysis(*args, **kwargs):
+    """Run the universe analysis, importing the engine on first use"""
+    from app.engine.modular_recommender import run_modular_analysis as run
+    return run(*args, **kwargs)
+
+
+def run_single_analysis(*args, **kwargs):
+    """Analyze one ticker, importing the engine on first use"""
+    from app.engine.modular_recommender import run_single_analysis as run
+    return run(*args, **kwargs)
+
+
+# Bounded pool for batch analyses; with BATCH_TIMEOUT set, a request stops waiting on a stalled upstream.
+# A thread cannot be interrupted, so an analysis that outlives the timeout keeps its worker, finishes on
+# its own and is published from _publish_late; _batch_slots caps running-plus-orphaned analyses at
+# BATCH_WORKERS and turns new triggers away past that
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch')
+_batch_slots = threading.BoundedSemaphore(BATCH_WORKERS)
+
+# The S3 upload and the Pushover call are independent I/O, so they run side by side
+_publish_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='publish')
+
+
+def _publish(recommendations):
+    """Persist results and send the push notification concurrently; re-raises the first failure"""
+    futures = [
+        _publish_executor.submit(persist_results, recommendations),
+        _publish_executor.submit(send_push_notification, recommendations),
+    ]
+    for future in futures:
+        future.result()
+
+
+def _publish_late(future):
+    """Done-callback for an analysis /run-now stopped waiting on: publish what it produced, then free its slot"""
+    try:
+        recommendations = future.result()
+        _publish(recommendations)
+        logger.info(f"Published {len(recommendations)} recommendations from a timed-out /run-now analysis")
+    except Exception as e:
+        logger.error(f"Timed-out /run-now analysis could not be published: {str(e)}")
+    finally:
+        _batch_slots.release()
+
+# Response dataclasses are handed to orjson as-is (native dataclass support), no jsonable_encoder walk
 @dataclass
 class RunNowResponse:
     status: str
@@ -38,6 +88,9 @@ class HealthResponse:
     timestamp: str
     version: str
 
+# Prod health body never changes (static timestamp), so it is serialized once at import
+_PROD_HEALTH_BYTES = dumps(HealthResponse("healthy", "2024-01-01T00:00:00.000000", "1.0.0"))
+
 @dataclass
 class ConfigUpdateRequest:
     config_type: str
@@ -52,15 +105,17 @@ class ConfigValidationRequest:
 app = FastAPI(
     title="Stock Recommendation Engine",
     description="Modular serverless stock analysis API",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=NumpyORJSONResponse
 )
 
 # Include API routers with error handling
-try:
-    from app.api.single_analysis import router as analysis_router
-    app.include_router(analysis_router)
-except ImportError as e:
-    logger.error(f"Could not import analysis router: {e}")
+if ENABLE_SYMBOL_ANALYSIS_API:
+    try:
+        from app.api.single_analysis import router as analysis_router
+        app.include_router(analysis_router)
+    except ImportError as e:
+        logger.error(f"Could not import analysis router: {e}")
 
 # Add CORS middleware for local development
 app.add_middleware(
@@ -76,46 +131,57 @@ app.add_middleware(CostOptimizedLoggingMiddleware)
 app.add_middleware(StructuredErrorLoggingMiddleware)
 
 
+def _render_health() -> bytes:
+    """Health body: static and pre-rendered in AWS, live timestamp in dev"""
+    if IS_LAMBDA:
+        return _PROD_HEALTH_BYTES
+    return dumps(HealthResponse("healthy", utc_now_iso(), "1.0.0"))
+
+
+# Outermost layer: probes are answered before routing and the other middleware
+app.add_middleware(HealthShortcutMiddleware, render=_render_health)
+
+
 @app.get("/health")
 def health_check(auth: bool = Depends(verify_api_key)):
     """Health check endpoint - optimized for minimal cost"""
-    # In AWS, skip timestamp generation to reduce computation
-    if os.getenv('AWS_LAMBDA_FUNCTION_NAME'):
-        return {
-            "status": "healthy",
-            "timestamp": "2024-01-01T00:00:00.000000",  # Static timestamp in prod
-            "version": "1.0.0"
-        }
-    else:
-        # In dev, provide accurate timestamp for debugging
-        return {
-            "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
-            "version": "1.0.0"
-        }
+    # Non-browser probes are served by HealthShortcutMiddleware; this handles the rest
+    return Response(content=_render_health(), media_type="application/json")
 
 
 @app.post("/run-now")
 def run_now(auth: bool = Depends(verify_api_key)):
     """Manual trigger for stock analysis using modular engine"""
+    if not _batch_slots.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Analysis workers busy, try again later")
     try:
         # Run the modular recommendation engine
-        recommendations = run_modular_analysis()
-        
-        # Persist results to S3
-        persist_results(recommendations)
-        
-        # Send Pushover notification
-        send_push_notification(recommendations)
-        
-        return {
-            "status": "success",
-            "recommendations": len(recommendations),
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
+        future = _batch_executor.submit(run_modular_analysis)
+    except Exception as e:
+        _batch_slots.release()
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    
+    # Only the wait itself can time out here; errors raised inside the analysis come back as themselves
+    try:
+        recommendations = future.result(timeout=BATCH_TIMEOUT or None)
+    except FutureTimeoutError:
+        # The analysis keeps running and holds its slot until done; its results are still published then
+        logger.error(f"Analysis timed out after {BATCH_TIMEOUT}s, results will be published when it finishes")
+        future.add_done_callback(_publish_late)
+        raise HTTPException(status_code=504, detail="Analysis timed out, results will be published when it finishes")
     except Exception as e:
+        _batch_slots.release()
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    _batch_slots.release()
+    
+    # Persist results to S3 and send Pushover notification
+    try:
+        _publish(recommendations)
+    except Exception as e:
+        logger.error(f"Publishing analysis results failed: {str(e)}")
+        raise HTTPException(status_code=502, detail=f"Analysis completed but publishing results failed: {str(e)}")
+    
+    return NumpyORJSONResponse(RunNowResponse("success", len(recommendations), utc_now_iso()))
 
 
 @app.post("/config/update")
@@ -125,7 +191,7 @@ def update_configuration(request: ConfigUpdateRequest, auth: bool = verify_api_k
         result = update_config_in_s3(request.config_type, request.symbols, request.backup)
         if not result['success']:
             raise HTTPException(status_code=400, detail=result['error'])
-        return result
+        return NumpyORJSONResponse(result)
     except HTTPException:
         raise
     except Exception as e:
@@ -137,30 +203,32 @@ def validate_symbols_endpoint(request: ConfigValidationRequest, auth: bool = ver
     """Validate stock symbols"""
     try:
         result = validate_symbols(request.symbols)
-        return result
+        return NumpyORJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to validate symbols: {str(e)}")
 
 
-@app.post("/recon/run")
-def run_reconciliation(auth: bool = verify_api_key):
-    """Manual trigger for daily reconciliation"""
-    try:
-        from app.services.recon_service import run_daily_reconciliation
-        result = run_daily_reconciliation()
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to run reconciliation: {str(e)}")
+if ENABLE_RECON_API:
+    @app.post("/recon/run")
+    def run_reconciliation(auth: bool = verify_api_key):
+        """Manual trigger for daily reconciliation"""
+        try:
+            from app.services.recon_service import run_daily_reconciliation
+            result = run_daily_reconciliation()
+            return NumpyORJSONResponse(result)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to run reconciliation: {str(e)}")
 
 
-@app.post("/analysis/{symbol}")
-def analyze_symbol(symbol: str, auth: bool = verify_api_key):
-    """Analyze a single stock symbol"""
-    try:
-        result = run_single_analysis(symbol)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to analyze symbol: {str(e)}")
+if ENABLE_SYMBOL_ANALYSIS_API:
+    @app.post("/analysis/{symbol}")
+    def analyze_symbol(symbol: str, auth: bool = verify_api_key):
+        """Analyze a single stock symbol"""
+        try:
+            result = run_single_analysis(symbol)
+            return NumpyORJSONResponse(result)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to analyze symbol: {str(e)}")
 
 
 @app.get("/config/{config_type}")
@@ -174,7 +242,7 @@ def get_config(config_type: str, auth: bool = Depends(verify_api_key)):
         if not result['success']:
             raise HTTPException(status_code=404, detail=result.get('error', 'Configuration not found'))
             
-        return result
+        return NumpyORJSONResponse(result)
             
     except HTTPException:
         raise
@@ -188,12 +256,27 @@ def get_config_json(config_type: str, auth: bool = Depends(verify_api_key)):
     return get_config(config_type, auth)
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """True when an If-None-Match header names etag (weak comparison, as for GET)"""
+    if not if_none_match:
+        return False
+    etag = etag.removeprefix('W/')
+    return any(tag == '*' or tag.removeprefix('W/') == etag for tag in map(str.strip, if_none_match.split(',')))
+
+
 @app.get("/recommendations")
-def get_recommendations_fallback(auth: bool = verify_api_key):
+def get_recommendations_fallback(request: Request, auth: bool = verify_api_key):
     """Get latest recommendations from S3 - FALLBACK ONLY"""
     try:
-        from app.services.s3_store import get_latest_results
-        return get_latest_results()
+        from app.services.s3_store import get_latest_results_with_etag
+        etag, data = get_latest_results_with_etag()
+        if etag is None:
+            return NumpyORJSONResponse(data)
+        
+        headers = {"ETag": etag, "Cache-Control": "private, max-age=60"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return NumpyORJSONResponse(data, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get recommendations: {str(e)}")
 
@@ -203,8 +286,15 @@ def get_recommendations_fallback(auth: bool = verify_api_key):
 # This ensures no conflicts between local and AWS environments
 
 
-# Mangum adapter for Lambda
-asgi_handler = Mangum(app)
+@lru_cache(maxsize=1)
+def _get_asgi_handler():
+    """Mangum adapter for Lambda, built when the first API Gateway event arrives (cron runs never need it)"""
+    from mangum import Mangum
+    return Mangum(app)
+
+
+# EventBridge rule ARNs that route a cron event to reconciliation instead of analysis
+_is_weekly_recon_arn = re.compile(r"StockAnalyzerWeeklyRecon").search
 
 
 def handler(event, context):
@@ -220,7 +310,7 @@ def handler(event, context):
             
             # Check if this is the weekly reconciliation trigger
             resources = event.get("resources", [])
-            if any("StockAnalyzerWeeklyRecon" in resource for resource in resources):
+            if any(map(_is_weekly_recon_arn, resources)):
                 logger.info("Weekly reconciliation trigger detected")
                 
                 # Run reconciliation
@@ -229,11 +319,11 @@ def handler(event, context):
                 
                 return {
                     "statusCode": 200,
-                    "body": json.dumps({
+                    "body": dumps({
                         "status": "weekly reconciliation executed",
                         "reconciled_count": recon_result.get("reconciled_count", 0),
-                        "timestamp": datetime.utcnow().isoformat()
-                    })
+                        "timestamp": utc_now_iso()
+                    }).decode()
                 }
             else:
                 # Regular stock analysis trigger
@@ -242,37 +332,60 @@ def handler(event, context):
                 # Run the modular recommendation engine
                 recommendations = run_modular_analysis()
                 
-                # Persist results to S3
-                persist_results(recommendations)
-                
-                # Send Pushover notification
-                send_push_notification(recommendations)
+                # Persist results to S3 and send Pushover notification
+                _publish(recommendations)
                 
                 return {
                     "statusCode": 200,
-                    "body": json.dumps({
+                    "body": dumps({
                         "status": "stock analysis executed",
                         "count": len(recommendations),
-                        "timestamp": datetime.utcnow().isoformat()
-                    })
+                        "timestamp": utc_now_iso()
+                    }).decode()
                 }
         
+        # Cron-only deployments have no API Gateway integration; refuse rather than build the ASGI adapter
+        elif LAMBDA_ROLE == "cron":
+            logger.warning("Non-cron event received by cron-only Lambda", event_source=event.get("source", "unknown"))
+            return {
+                "statusCode": 400,
+                "body": dumps({
+                    "error": "This function only handles scheduled EventBridge events",
+                    "timestamp": utc_now_iso()
+                }).decode()
+            }
+        
         # Handle API Gateway requests
         else:
-            return asgi_handler(event, context)
+            return _get_asgi_handler()(event, context)
             
     except Exception as e:
         logger.error(f"Lambda handler error: {str(e)}", error=str(e), event_source=event.get("source", "unknown"))
         return {
             "statusCode": 500,
-            "body": json.dumps({
+            "body": dumps({
                 "error": f"Internal server error: {str(e)}",
-                "timestamp": datetime.utcnow().isoformat()
-            })
+                "timestamp": utc_now_iso()
+            }).decode()
         }
 
 
 if __name__ == "__main__":
-    # For local testing
+    # For local testing; sync endpoints run on uvicorn's threadpool so scans don't block other requests
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from importlib.util import find_spec
+    workers = int(os.getenv('WEB_WORKERS', '1'))
+    reload = os.getenv('DEV_RELOAD') == '1'
+    uvicorn.run(
+        "app.main:app" if workers > 1 or reload else app,
+        host=os.getenv('API_HOST', '0.0.0.0'),
+        port=int(os.getenv('API_PORT', '8000')),
+        workers=workers,
+        reload=reload,
+        # uvloop/httptools are installed by start.sh; fall back to the pure-Python stack without them
+        loop="uvloop" if find_spec("uvloop") else "asyncio",
+        http="httptools" if find_spec("httptools") else "h11",
+        # CostOptimizedLoggingMiddleware already logs API calls
+        access_log=False,
+        log_level="warning"
+    )
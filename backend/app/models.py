@@ -2,12 +2,12 @@
 Data models for the Stock Recommendation Engine
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Recommendation:
     """Enhanced stock recommendation model"""
     symbol: str
@@ -21,20 +21,29 @@ class Recommendation:
     recommendation: str
     score: float = 0.0
     reasoning: str = ""
-    fundamental: Dict[str, Any] = None
+    fundamental: Optional[Dict[str, Any]] = field(default=None)
     timestamp: str = ""
     
     # Enhanced fields for spec_lambda_enhance.md
     target_price: Optional[float] = None
     stop_loss: Optional[float] = None
     confidence_level: Optional[str] = None
-    technical_indicators: List[str] = None
+    technical_indicators: Optional[List[str]] = field(default=None)
     price_chart_url: Optional[str] = None
     days_to_target: Optional[int] = None
     target_met: Optional[bool] = None
     stop_loss_hit: Optional[bool] = None
 
 
+@dataclass(slots=True, frozen=True)
+class AnalysisMetadata:
+    """Per-recommendation metadata from a universe analysis run (serialized natively by orjson)"""
+    analysis_period: str
+    data_points: int
+    cache_used: bool
+    analysis_timestamp: str
+
+
 @dataclass
 class AnalysisResponse:
     """Response model for stock analysis"""
@@ -69,7 +78,7 @@ class RunNowResponse:
     timestamp: str
 
 
-@dataclass
+@dataclass(slots=True)
 class HistoricalData:
     """Historical recommendations data model"""
     timestamp: str
@@ -78,7 +87,7 @@ class HistoricalData:
     recommendations: List[Recommendation]
 
 
-@dataclass
+@dataclass(slots=True)
 class LatestData:
     """Latest recommendations data model"""
     timestamp: str
@@ -122,7 +131,7 @@ class ConfigValidation:
     environment: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ReconData:
     """Reconciliation data for recommendations"""
     symbol: str
@@ -3,28 +3,103 @@ Data Loader Module - Fetches OHLCV data from Yahoo Finance with S3 caching
 """
 
 import yfinance as yf
+from yfinance.exceptions import YFRateLimitError
 import pandas as pd
 import boto3
 import requests
+from requests.adapters import HTTPAdapter
 import os
 import json
 import time
 import random
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+# S3 price cache object per ticker; one format everywhere so every environment shares the same cache
+CACHE_FILE = 'data.json'
+
+# Single HTTP session shared by all loaders and the recommender so connections to Yahoo are reused
+HTTP_POOL_SIZE = 32
+_http_session = None
+_http_session_lock = threading.Lock()
+
+# Recently fetched frames keyed by (ticker, period) -> (monotonic time, DataFrame)
+PRICE_CACHE_TTL = int(os.getenv('PRICE_CACHE_TTL', '30'))
+PRICE_CACHE_MAX_AGE = 300
+_price_cache: Dict[Tuple[str, str], Tuple[float, pd.DataFrame]] = {}
+_price_cache_lock = threading.Lock()
+
+# Cache misses are downloaded from Yahoo in multi-ticker batches; 429s back off with jitter and retry
+DOWNLOAD_BATCH_SIZE = 50
+CACHE_LOOKUP_WORKERS = 8
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF = 2.0
+_S3_CACHE_CONFIG = Config(max_pool_connections=CACHE_LOOKUP_WORKERS * 2, retries={'max_attempts': 2})
+
+
+def get_http_session() -> requests.Session:
+    """Get or create the shared HTTP session"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                session.headers.update({
+                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+                })
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _http_session = session
+    return _http_session
+
+
+def download_looks_rate_limited(data: Optional[pd.DataFrame], tickers: List[str]) -> bool:
+    """
+    Whether a multi-ticker yf.download came back the way a 429 leaves it: no prices for any ticker
+    
+    yf.download catches per-ticker errors (rate limits included) and hands back empty or all-NaN
+    frames instead of raising. A single empty ticker is more likely unknown or delisted than
+    throttled, so one-ticker batches only count as rate-limited when YFRateLimitError is raised.
+    """
+    if len(tickers) < 2:
+        return False
+    return data is None or data.empty or not data.notna().to_numpy().any()
+
+
+def _get_cached_prices(ticker: str, period: str) -> Optional[pd.DataFrame]:
+    """Return a copy of a recently fetched frame, or None if absent/expired"""
+    with _price_cache_lock:
+        cached = _price_cache.get((ticker, period))
+    if cached and time.monotonic() - cached[0] < PRICE_CACHE_TTL:
+        return cached[1].copy()
+    return None
+
+
+def _store_cached_prices(ticker: str, period: str, df: pd.DataFrame):
+    """Remember a fetched frame and prune entries past the max age"""
+    now = time.monotonic()
+    with _price_cache_lock:
+        for key in [k for k, (ts, _) in _price_cache.items() if now - ts > PRICE_CACHE_MAX_AGE]:
+            del _price_cache[key]
+        _price_cache[(ticker, period)] = (now, df)
+
+
 class DataLoader:
     """Optimized data loader with S3 caching and batch processing"""
     
     def __init__(self, s3_bucket: str = None, use_s3_cache: bool = True):
         self.s3_bucket = s3_bucket or os.getenv('S3_BUCKET_NAME', '7h-stock-analyzer-dev')
         self.use_s3_cache = use_s3_cache
-        self.s3_client = boto3.client('s3') if use_s3_cache else None
+        # Enough pooled connections for the concurrent cache lookups in fetch_batch
+        self.s3_client = boto3.client('s3', config=_S3_CACHE_CONFIG) if use_s3_cache else None
         self.cache_ttl_days = 1  # Cache data for 1 day
         
     def fetch_single_ticker(self, ticker: str, period: str = "1y") -> pd.DataFrame:
@@ -32,17 +107,9 @@ class DataLoader:
         ticker = ticker.upper().strip()
         logger.info(f"Starting fetch for {ticker}")
         
-        # Check S3 cache first
-        if self.use_s3_cache:
-            logger.info(f"Checking S3 cache for {ticker}")
-            cached_data = self._get_from_cache(ticker)
-            if cached_data is not None:
-                logger.info(f"Cache hit for {ticker}")
-                return cached_data
-            else:
-                logger.info(f"Cache miss for {ticker}")
-        else:
-            logger.info(f"S3 cache disabled for {ticker}")
+        cached_data = self._get_cached(ticker, period)
+        if cached_data is not None:
+            return cached_data
         
         # Fetch from Yahoo Finance
         try:
@@ -51,11 +118,8 @@ class DataLoader:
             # Add longer delay for rate limiting (avoid 429 errors)
             time.sleep(random.uniform(2.0, 3.0))
             
-            # Create session with proper headers to avoid blocking
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            })
+            # Reuse the shared session (proper headers to avoid blocking)
+            session = get_http_session()
             
             # Try ticker object approach first (more reliable)
             ticker_obj = yf.Ticker(ticker, session=session)
@@ -85,13 +149,7 @@ class DataLoader:
             
             logger.info(f"Successfully fetched {len(df)} rows for {ticker} with columns: {list(df.columns)}")
             
-            # Clean and validate data
-            df = self._clean_data(df, ticker)
-            
-            # Save to S3 cache
-            if self.use_s3_cache and not df.empty:
-                self._save_to_cache(ticker, df)
-            
+            df = self._finish_fetch(ticker, period, df)
             logger.info(f"Returning {len(df)} rows for {ticker}")
             return df
             
@@ -99,34 +157,131 @@ class DataLoader:
             logger.error(f"Failed to fetch data for {ticker}: {str(e)}")
             return pd.DataFrame()
     
+    def _get_cached(self, ticker: str, period: str) -> Optional[pd.DataFrame]:
+        """Prices from the in-process cache, then the S3 cache; None on a miss"""
+        # Check in-process cache of recent fetches
+        cached_data = _get_cached_prices(ticker, period)
+        if cached_data is not None:
+            logger.info(f"Memory cache hit for {ticker}")
+            return cached_data
+        
+        # Check S3 cache first
+        if self.use_s3_cache:
+            logger.info(f"Checking S3 cache for {ticker}")
+            cached_data = self._get_from_cache(ticker)
+            if cached_data is not None:
+                logger.info(f"Cache hit for {ticker}")
+                _store_cached_prices(ticker, period, cached_data.copy())
+                return cached_data
+            else:
+                logger.info(f"Cache miss for {ticker}")
+        else:
+            logger.info(f"S3 cache disabled for {ticker}")
+        return None
+    
+    def _finish_fetch(self, ticker: str, period: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Clean freshly downloaded prices and write them through to both caches"""
+        # Clean and validate data
+        df = self._clean_data(df, ticker)
+        
+        # Save to S3 cache
+        if self.use_s3_cache and not df.empty:
+            self._save_to_cache(ticker, df)
+        
+        if not df.empty:
+            _store_cached_prices(ticker, period, df.copy())
+        return df
+    
+    def _download_batch(self, tickers: List[str], period: str) -> Dict[str, pd.DataFrame]:
+        """
+        One multi-ticker yf.download, split into per-ticker OHLCV frames
+        
+        Tickers Yahoo returned nothing for are left out. Retries with jittered
+        backoff only when the batch was rate-limited.
+        """
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            try:
+                data = yf.download(
+                    tickers,
+                    period=period,
+                    group_by='ticker',
+                    auto_adjust=True,  # same adjusted prices as Ticker.history()
+                    ignore_tz=False,
+                    threads=True,
+                    progress=False
+                )
+                rate_limited = download_looks_rate_limited(data, tickers)
+            except YFRateLimitError:
+                data, rate_limited = None, True
+            except Exception as e:
+                logger.error(f"Batch download failed for {tickers}: {str(e)}")
+                return {}
+            if not rate_limited or attempt == RATE_LIMIT_RETRIES:
+                break
+            logger.warning(f"Batch download rate-limited, retry {attempt + 1}/{RATE_LIMIT_RETRIES}")
+            time.sleep(RATE_LIMIT_BACKOFF * 2 ** attempt + random.uniform(0.0, 1.0))
+        
+        if data is None or data.empty:
+            return {}
+        
+        frames = {}
+        grouped = isinstance(data.columns, pd.MultiIndex)
+        available = set(data.columns.get_level_values(0)) if grouped else set(tickers[:1])
+        for ticker in tickers:
+            if ticker not in available:
+                continue
+            # Rows are the union of every ticker's sessions; drop the ones this ticker did not trade
+            df = (data[ticker] if grouped else data).dropna(how='all')
+            if not df.empty:
+                frames[ticker] = df
+        return frames
+    
     def fetch_batch(self, tickers: List[str], period: str = "1y", 
-                   batch_size: int = 3, max_workers: int = 1) -> Dict[str, pd.DataFrame]:
-        """Fetch data for multiple tickers with batch processing and rate limiting"""
+                   batch_size: int = DOWNLOAD_BATCH_SIZE, max_workers: int = CACHE_LOOKUP_WORKERS) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch data for multiple tickers with batch processing and rate limiting
+        
+        Cache hits are resolved first (max_workers concurrent lookups); the misses go
+        to Yahoo as one multi-ticker download per batch_size tickers, falling back to
+        a per-ticker fetch for anything a batch did not return. A batch that returned
+        nothing at all (still rate-limited after its retries) gets no per-ticker fallback.
+        """
         results = {}
+        symbols = [ticker.upper().strip() for ticker in tickers]
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            cached = list(executor.map(lambda symbol: self._get_cached(symbol, period), symbols))
+        missing = []
+        for ticker, symbol, df in zip(tickers, symbols, cached):
+            if df is not None:
+                results[ticker] = df
+            else:
+                missing.append((ticker, symbol))
         
         # Process in batches to avoid rate limits
-        for i in range(0, len(tickers), batch_size):
-            batch_tickers = tickers[i:i + batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1}: {batch_tickers}")
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i:i + batch_size]
+            logger.info(f"Processing batch {i//batch_size + 1}: {[symbol for _, symbol in batch]}")
             
-            # Use ThreadPoolExecutor for parallel processing (reduced concurrency)
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_ticker = {
-                    executor.submit(self.fetch_single_ticker, ticker, period): ticker 
-                    for ticker in batch_tickers
-                }
-                
-                for future in as_completed(future_to_ticker):
-                    ticker = future_to_ticker[future]
+            frames = self._download_batch([symbol for _, symbol in batch], period)
+            if not frames and len(batch) > 1:
+                # Per-ticker requests would only hit the same limit harder, one slow sleep at a time
+                logger.warning(f"Batch {i//batch_size + 1} returned no data, skipping per-ticker fallback")
+            else:
+                for ticker, symbol in batch:
                     try:
-                        df = future.result()
+                        if symbol in frames:
+                            df = self._finish_fetch(symbol, period, frames[symbol])
+                        else:
+                            logger.info(f"{symbol} missing from batch download, fetching individually")
+                            df = self.fetch_single_ticker(symbol, period)
                         if not df.empty:
                             results[ticker] = df
                     except Exception as e:
                         logger.error(f"Error processing {ticker}: {str(e)}")
             
             # Rate limiting - longer delay between batches
-            if i + batch_size < len(tickers):
+            if i + batch_size < len(missing):
                 delay = random.uniform(2.0, 4.0)
                 logger.info(f"Delaying {delay:.2f}s before next batch...")
                 time.sleep(delay)
@@ -136,33 +291,26 @@ class DataLoader:
     
     def fetch_universe(self, tickers: List[str], period: str = "1y") -> Dict[str, pd.DataFrame]:
         """Fetch data for entire universe with optimization for large sets"""
-        # Always use small batches to avoid rate limiting
-        return self.fetch_batch(tickers, period, batch_size=5, max_workers=1)
+        return self.fetch_batch(tickers, period)
     
     def _get_from_cache(self, ticker: str) -> Optional[pd.DataFrame]:
         """Get data from S3 cache if available and fresh"""
         try:
-            cache_key = f"{ticker}/data.json"
-            
-            # Check if object exists and get metadata
-            response = self.s3_client.head_object(Bucket=self.s3_bucket, Key=cache_key)
-            last_modified = response['LastModified']
-            age_days = (datetime.now(last_modified.tzinfo) - last_modified).days
+            cache_key = f"{ticker}/{CACHE_FILE}"
             
-            if age_days > self.cache_ttl_days:
-                logger.info(f"Cache expired for {ticker} ({age_days} days old)")
-                return None
+            # One conditional GET: S3 answers 304 with no body once the object is older than
+            # cache_ttl_days whole days (the age at which it counts as expired)
+            cutoff = datetime.now(timezone.utc) - timedelta(days=self.cache_ttl_days + 1)
+            response = self.s3_client.get_object(Bucket=self.s3_bucket, Key=cache_key, IfModifiedSince=cutoff)
             
             # Load cached data
-            response = self.s3_client.get_object(Bucket=self.s3_bucket, Key=cache_key)
-            import json
-            content = response['Body'].read().decode('utf-8')
+            content = response['Body'].read()
             
             # Handle empty content
             if not content.strip():
                 logger.warning(f"Empty cache content for {ticker}")
                 return None
-                
+            
             data = json.loads(content)
             df = pd.DataFrame(data['data'], columns=data['columns'], index=pd.to_datetime(data['index']))
             
@@ -174,7 +322,9 @@ class DataLoader:
                 return None
                 
         except ClientError as e:
-            if e.response['Error']['Code'] == '404':
+            if e.response.get('ResponseMetadata', {}).get('HTTPStatusCode') == 304:
+                logger.info(f"Cache expired for {ticker}")
+            elif e.response['Error']['Code'] in ('404', 'NoSuchKey'):
                 logger.debug(f"No cache found for {ticker}")
             else:
                 logger.error(f"Cache error for {ticker}: {str(e)}")
@@ -186,7 +336,7 @@ class DataLoader:
     def _save_to_cache(self, ticker: str, df: pd.DataFrame):
         """Save data to S3 cache"""
         try:
-            cache_key = f"{ticker}/data.json"
+            cache_key = f"{ticker}/{CACHE_FILE}"
             
             # Convert DataFrame to JSON
             data = {
@@ -214,15 +364,17 @@ class DataLoader:
             return df
         
         # Remove any duplicate rows
-        df = df[~df.index.duplicated(keep='first')]
+        if df.index.has_duplicates:
+            df = df[~df.index.duplicated(keep='first')]
         
-        # Sort by date
-        df = df.sort_index()
+        # Sort by date (Yahoo already returns ascending dates)
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
         
-        # Handle missing values
-        df = df.ffill().bfill()
+        # Carry the last known values forward only; back-filling would copy later prices into earlier rows
+        df = df.ffill()
         
-        # Remove any remaining NaN rows
+        # Remove any remaining NaN rows (leading gaps with nothing to carry forward)
         df = df.dropna()
         
         # Validate required columns
@@ -265,21 +417,19 @@ class DataLoader:
             return {'cached_tickers': 0, 'total_size_mb': 0}
         
         try:
-            # List all cached tickers
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.s3_bucket,
-                Prefix='',
-                Delimiter='/'
-            )
+            # List all cached tickers; pages past the first 1000 keys are followed, and no
+            # delimiter is set since it would fold every {ticker}/ key into CommonPrefixes
+            paginator = self.s3_client.get_paginator('list_objects_v2')
             
             cached_tickers = []
             total_size = 0
             
-            for obj in response.get('Contents', []):
-                if obj['Key'].endswith('/data.parquet'):
-                    ticker = obj['Key'].split('/')[0]
-                    cached_tickers.append(ticker)
-                    total_size += obj['Size']
+            for page in paginator.paginate(Bucket=self.s3_bucket):
+                for obj in page.get('Contents', []):
+                    if obj['Key'].endswith(f'/{CACHE_FILE}'):
+                        ticker = obj['Key'].split('/')[0]
+                        cached_tickers.append(ticker)
+                        total_size += obj['Size']
             
             return {
                 'cached_tickers': len(cached_tickers),
@@ -296,19 +446,24 @@ class DataLoader:
         try:
             if ticker:
                 # Clear specific ticker
-                cache_key = f"{ticker}/data.parquet"
+                cache_key = f"{ticker}/{CACHE_FILE}"
                 self.s3_client.delete_object(Bucket=self.s3_bucket, Key=cache_key)
                 logger.info(f"Cleared cache for {ticker}")
             else:
-                # Clear all cache
-                response = self.s3_client.list_objects_v2(Bucket=self.s3_bucket)
-                if 'Contents' in response:
-                    delete_keys = [{'Key': obj['Key']} for obj in response['Contents']]
-                    self.s3_client.delete_objects(
-                        Bucket=self.s3_bucket,
-                        Delete={'Objects': delete_keys}
-                    )
-                    logger.info("Cleared all cache")
+                # Clear all cached tickers, one delete_objects call per listing page (both cap at 1000 keys);
+                # the bucket also holds results, config and the site, so only {ticker}/CACHE_FILE keys go
+                paginator = self.s3_client.get_paginator('list_objects_v2')
+                for page in paginator.paginate(Bucket=self.s3_bucket):
+                    delete_keys = [
+                        {'Key': obj['Key']} for obj in page.get('Contents', [])
+                        if obj['Key'].endswith(f'/{CACHE_FILE}')
+                    ]
+                    if delete_keys:
+                        self.s3_client.delete_objects(
+                            Bucket=self.s3_bucket,
+                            Delete={'Objects': delete_keys}
+                        )
+                logger.info("Cleared all cache")
             return True
         except Exception as e:
             logger.error(f"Failed to clear cache: {str(e)}")
@@ -3,13 +3,17 @@ Indicator Engine Module - Computes comprehensive suite of technical indicators
 """
 
 import pandas as pd
-# import numpy as np
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from collections import OrderedDict
 from typing import Dict, List, Optional
+import hashlib
 import logging
+import os
+import threading
+from app.jit import njit
 try:
-    from ta.trend import EMAIndicator, SMAIndicator, MACD, ADXIndicator
-    from ta.momentum import RSIIndicator, StochRSIIndicator, ROCIndicator
-    from ta.volatility import BollingerBands, AverageTrueRange
+    from ta.volatility import BollingerBands
     from ta.volume import OnBalanceVolumeIndicator, VolumeWeightedAveragePrice
     from ta.others import DailyReturnIndicator
     TA_AVAILABLE = True
@@ -19,6 +23,141 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Indicator frames keyed by a digest of the input prices; same prices -> same indicators (0 disables)
+INDICATOR_CACHE_SIZE = int(os.getenv('INDICATOR_CACHE_SIZE', '64'))
+_indicator_cache: "OrderedDict[bytes, pd.DataFrame]" = OrderedDict()
+_indicator_cache_lock = threading.Lock()
+
+
+def _frame_digest(df: pd.DataFrame) -> Optional[bytes]:
+    """Digest of a frame's index, column names and values; None if any column is not numeric"""
+    digest = hashlib.blake2b(digest_size=16)
+    index = df.index
+    digest.update(str(index.dtype).encode())
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(index.asi8.tobytes())
+    elif index.dtype.kind in 'iuf':
+        digest.update(index.to_numpy().tobytes())
+    else:
+        return None
+    for name, column in df.items():
+        values = column.to_numpy()
+        if values.dtype.kind not in 'biufMm':
+            return None
+        digest.update(f"{name}|{values.dtype}|".encode())
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.digest()
+
+
+def _get_cached_indicators(key: bytes) -> Optional[pd.DataFrame]:
+    """Return a copy of the indicator frame computed for key, or None"""
+    with _indicator_cache_lock:
+        cached = _indicator_cache.get(key)
+        if cached is not None:
+            _indicator_cache.move_to_end(key)
+    return cached.copy() if cached is not None else None
+
+
+def _store_cached_indicators(key: bytes, df: pd.DataFrame):
+    """Remember an indicator frame, evicting the least recently used past INDICATOR_CACHE_SIZE"""
+    with _indicator_cache_lock:
+        _indicator_cache[key] = df
+        _indicator_cache.move_to_end(key)
+        while len(_indicator_cache) > INDICATOR_CACHE_SIZE:
+            _indicator_cache.popitem(last=False)
+
+
+def _rolling_mean_abs_deviation(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean absolute deviation over each trailing window, NaN until the first full window"""
+    out = np.full(values.size, np.nan)
+    if values.size >= window:
+        windows = sliding_window_view(values, window)
+        out[window - 1:] = np.abs(windows - windows.mean(axis=1, keepdims=True)).mean(axis=1)
+    return out
+
+
+@njit(cache=True)
+def _wilder_running_sum(seed, values, window, size):
+    """
+    ta's ADX running sum: out[i] = out[i-1] - out[i-1] / window + values[window + i]
+    
+    out[0] is the seed; like ta, the loop stops one short so the last slot stays 0.
+    """
+    out = np.zeros(size)
+    out[0] = seed
+    for i in range(1, size - 1):
+        out[i] = out[i - 1] - (out[i - 1] / float(window)) + values[window + i]
+    return out
+
+
+@njit(cache=True)
+def _wilder_average(out, values, start, window, lag):
+    """Wilder smoothing in place from start: out[i] = (out[i-1] * (window-1) + values[i-lag]) / window"""
+    for i in range(start, out.size):
+        out[i] = (out[i - 1] * (window - 1) + values[i - lag]) / float(window)
+    return out
+
+
+def _shift1(values: np.ndarray) -> np.ndarray:
+    """values lagged by one bar, NaN first"""
+    out = np.empty_like(values)
+    out[0] = np.nan
+    out[1:] = values[:-1]
+    return out
+
+
+def _average_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+    """ATR exactly as ta.volatility.AverageTrueRange, with the Wilder loop run natively"""
+    prev_close = _shift1(close)
+    true_range = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    atr = np.zeros(close.size)
+    atr[window - 1] = np.nanmean(true_range[:window])
+    return _wilder_average(atr, true_range, window, window, 0)
+
+
+def _average_directional_index(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int):
+    """ADX, +DI and -DI exactly as ta.trend.ADXIndicator, with its three running sums run natively"""
+    n = close.size
+    size = n - (window - 1)
+    prev_close = _shift1(close)
+    directional_movement = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+    diff_up = high - _shift1(high)
+    diff_down = _shift1(low) - low
+    pos = np.abs(((diff_up > diff_down) & (diff_up > 0)) * diff_up)
+    neg = np.abs(((diff_down > diff_up) & (diff_down > 0)) * diff_down)
+    
+    # Seeds sum the first window non-NaN values, as ta's dropna().iloc[:window].sum() does
+    trs = _wilder_running_sum(
+        directional_movement[~np.isnan(directional_movement)][:window].sum(), directional_movement, window, size)
+    dip = _wilder_running_sum(pos[~np.isnan(pos)][:window].sum(), pos, window, size)
+    din = _wilder_running_sum(neg[~np.isnan(neg)][:window].sum(), neg, window, size)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_pos = np.where(trs != 0, 100 * (dip / trs), 0.0)
+        di_neg = np.where(trs != 0, 100 * (din / trs), 0.0)
+        di_sum = di_pos + di_neg
+        directional_index = np.where(di_sum != 0, 100 * np.abs((di_pos - di_neg) / di_sum), 0.0)
+    
+    adx = np.zeros(size)
+    adx[window] = directional_index[:window].mean()
+    adx = np.concatenate((np.zeros(window - 1), _wilder_average(adx, directional_index, window + 1, window, 1)))
+    
+    # +DI/-DI columns cover trs[1:-1], placed window bars later
+    adx_pos = np.zeros(n)
+    adx_neg = np.zeros(n)
+    adx_pos[window + 1:] = di_pos[1:size - 1]
+    adx_neg[window + 1:] = di_neg[1:size - 1]
+    return adx, adx_pos, adx_neg
+
+
+def _rsi(close: pd.Series, window: int) -> pd.Series:
+    """Wilder RSI as computed by ta.momentum.RSIIndicator (100 where there are no losses)"""
+    diff = close.diff()
+    up = diff.where(diff > 0, 0.0).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    down = (-diff.where(diff < 0, 0.0)).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    return pd.Series(np.where(down == 0, 100, 100 - 100 / (1 + up / down)), index=close.index)
+
+
 class IndicatorEngine:
     """Comprehensive technical indicator computation engine"""
     
@@ -32,7 +171,14 @@ class IndicatorEngine:
         }
     
     def compute_all_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Compute comprehensive suite of technical indicators"""
+        """
+        Compute comprehensive suite of technical indicators
+        
+        Each group writes plain arrays into one dict keyed by column name, and the
+        result is joined onto df with a single concat instead of one block insert per column.
+        Results are memoized on a digest of df, so the same prices (e.g. from the price
+        cache) are only computed once per process.
+        """
         if not TA_AVAILABLE:
             logger.warning("TA library not available, returning basic indicators")
             # Add basic moving averages using pandas
@@ -45,198 +191,278 @@ class IndicatorEngine:
             logger.warning("Insufficient data for indicator computation")
             return df
         
-        df_indicators = df.copy()
+        cache_key = _frame_digest(df) if INDICATOR_CACHE_SIZE > 0 else None
+        if cache_key is not None:
+            cached = _get_cached_indicators(cache_key)
+            if cached is not None:
+                logger.debug("Indicator cache hit")
+                return cached
+        
+        cols: Dict[str, np.ndarray] = {}
         
         try:
             # Trend Indicators (40% weight)
-            df_indicators = self._compute_trend_indicators(df_indicators)
+            cols = self._compute_trend_indicators(df, cols)
             
             # Momentum Indicators (30% weight)
-            df_indicators = self._compute_momentum_indicators(df_indicators)
+            cols = self._compute_momentum_indicators(df, cols)
             
             # Volatility Indicators (20% weight)
-            df_indicators = self._compute_volatility_indicators(df_indicators)
+            cols = self._compute_volatility_indicators(df, cols)
             
             # Volume Indicators (10% weight)
-            df_indicators = self._compute_volume_indicators(df_indicators)
+            cols = self._compute_volume_indicators(df, cols)
             
             # Additional indicators
-            df_indicators = self._compute_other_indicators(df_indicators)
+            cols = self._compute_other_indicators(df, cols)
+            
+            # Recomputed columns replace stale ones rather than being duplicated
+            stale = df.columns.intersection(list(cols))
+            base = df.drop(columns=stale) if len(stale) else df
+            df_indicators = pd.concat([base, pd.DataFrame(cols, index=df.index)], axis=1)
             
             logger.info(f"Computed {len([col for col in df_indicators.columns if col not in df.columns])} indicators")
             
         except Exception as e:
-            logger.error(f"Error computing indicators: {str(e)}")
+            logger.error(f"Error computing indicators: {str(e)}", exc_info=True)
             return df
         
+        if cache_key is not None:
+            _store_cached_indicators(cache_key, df_indicators.copy())
         return df_indicators
     
-    def _compute_trend_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def compute_universe_trend(self, data_dict: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Precompute close-only trend indicators (EMA, SMA, MACD) for many tickers at once
+        
+        Tickers sharing the same trading calendar are stacked column-wise into one
+        wide float block so each moving average runs as a single vectorized pass
+        instead of one per ticker. Results match the per-ticker _compute_trend_indicators;
+        compute_all_indicators skips any of these columns that are already present.
+        Tickers with too little data or a differing calendar are returned unchanged.
+        """
+        groups: Dict[tuple, List[str]] = {}
+        for ticker, df in data_dict.items():
+            if len(df) >= 50 and 'Close' in df.columns:
+                groups.setdefault((len(df), df.index[0], df.index[-1]), []).append(ticker)
+        
+        result = dict(data_dict)
+        for tickers in groups.values():
+            index = data_dict[tickers[0]].index
+            members = [t for t in tickers if data_dict[t].index.equals(index)]
+            if len(members) < 2:
+                continue
+            
+            closes = pd.concat([data_dict[t]['Close'] for t in members], axis=1, keys=members).astype(float)
+            ema_12 = closes.ewm(span=12, min_periods=12, adjust=False).mean()
+            ema_26 = closes.ewm(span=26, min_periods=26, adjust=False).mean()
+            sma_50 = closes.rolling(50, min_periods=50).mean()
+            sma_200 = closes.rolling(200, min_periods=200).mean()
+            macd = ema_12 - ema_26
+            macd_signal = macd.ewm(span=9, min_periods=9, adjust=False).mean()
+            macd_hist = macd - macd_signal
+            
+            for t in members:
+                result[t] = data_dict[t].assign(
+                    EMA_12=ema_12[t], EMA_26=ema_26[t],
+                    SMA_50=sma_50[t], SMA_200=sma_200[t],
+                    MACD=macd[t], MACD_Signal=macd_signal[t], MACD_Histogram=macd_hist[t]
+                )
+        
+        return result
+    
+    def _compute_trend_indicators(self, df: pd.DataFrame, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
         """Compute trend-based indicators"""
         try:
-            # EMA (12, 26)
-            ema_12 = EMAIndicator(df['Close'], window=12)
-            ema_26 = EMAIndicator(df['Close'], window=26)
-            df['EMA_12'] = ema_12.ema_indicator()
-            df['EMA_26'] = ema_26.ema_indicator()
-            
-            # SMA (50, 200)
-            sma_50 = SMAIndicator(df['Close'], window=50)
-            sma_200 = SMAIndicator(df['Close'], window=200)
-            df['SMA_50'] = sma_50.sma_indicator()
-            df['SMA_200'] = sma_200.sma_indicator()
-            
-            # MACD
-            macd = MACD(df['Close'], window_slow=26, window_fast=12, window_sign=9)
-            df['MACD'] = macd.macd()
-            df['MACD_Signal'] = macd.macd_signal()
-            df['MACD_Histogram'] = macd.macd_diff()
+            # Close-only averages may already be filled in by compute_universe_trend
+            if 'MACD_Histogram' not in df.columns:
+                # One set of close-only passes (same formulas as ta); MACD reuses the EMAs
+                close = df['Close'].astype(float)
+                ema_12 = close.ewm(span=12, min_periods=12, adjust=False).mean().to_numpy()
+                ema_26 = close.ewm(span=26, min_periods=26, adjust=False).mean().to_numpy()
+                macd = ema_12 - ema_26
+                macd_signal = pd.Series(macd).ewm(span=9, min_periods=9, adjust=False).mean().to_numpy()
+                cols['EMA_12'] = ema_12
+                cols['EMA_26'] = ema_26
+                cols['SMA_50'] = close.rolling(50, min_periods=50).mean().to_numpy()
+                cols['SMA_200'] = close.rolling(200, min_periods=200).mean().to_numpy()
+                cols['MACD'] = macd
+                cols['MACD_Signal'] = macd_signal
+                cols['MACD_Histogram'] = macd - macd_signal
             
             # ADX (14) - Trend strength
-            adx = ADXIndicator(df['High'], df['Low'], df['Close'], window=14)
-            df['ADX'] = adx.adx()
-            df['ADX_Pos'] = adx.adx_pos()
-            df['ADX_Neg'] = adx.adx_neg()
+            cols['ADX'], cols['ADX_Pos'], cols['ADX_Neg'] = _average_directional_index(
+                df['High'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64),
+                df['Close'].to_numpy(dtype=np.float64), 14
+            )
             
             logger.debug("Computed trend indicators")
             
         except Exception as e:
-            logger.error(f"Error computing trend indicators: {str(e)}")
+            logger.error(f"Error computing trend indicators: {str(e)}", exc_info=True)
         
-        return df
+        return cols
     
-    def _compute_momentum_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _compute_momentum_indicators(self, df: pd.DataFrame, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
         """Compute momentum-based indicators"""
         try:
-            # RSI (14)
-            rsi = RSIIndicator(df['Close'], window=14)
-            df['RSI_14'] = rsi.rsi()
+            close = df['Close'].to_numpy(dtype=np.float64)
+            high = df['High'].to_numpy(dtype=np.float64)
+            low = df['Low'].to_numpy(dtype=np.float64)
+            
+            # RSI (14), reused below for Stochastic RSI instead of being recomputed
+            rsi = _rsi(pd.Series(close), 14)
+            cols['RSI_14'] = rsi.to_numpy()
             
             # Stochastic RSI
-            stoch = StochRSIIndicator(df['Close'], window=14)
-            df['Stoch_K'] = stoch.stochrsi()
+            lowest_rsi = rsi.rolling(14).min()
+            cols['Stoch_K'] = ((rsi - lowest_rsi) / (rsi.rolling(14).max() - lowest_rsi)).to_numpy()
             # StochRSI doesn't have signal method, use None or calculate manually
-            df['Stoch_D'] = None
+            cols['Stoch_D'] = np.full(close.size, None, dtype=object)
             
             # Rate of Change
-            roc = ROCIndicator(df['Close'], window=10)
-            df['ROC_10'] = roc.roc()
+            close_10 = np.full(close.size, np.nan)
+            close_10[10:] = close[:-10]
+            cols['ROC_10'] = (close - close_10) / close_10 * 100
             
             # Williams %R (computed manually)
-            df['Williams_R'] = ((df['High'].rolling(14).max() - df['Close']) / 
-                              (df['High'].rolling(14).max() - df['Low'].rolling(14).min())) * -100
+            highest_high = df['High'].rolling(14).max()
+            cols['Williams_R'] = ((highest_high - df['Close']) /
+                                  (highest_high - df['Low'].rolling(14).min()) * -100).to_numpy()
             
-            # Commodity Channel Index (CCI)
-            tp = (df['High'] + df['Low'] + df['Close']) / 3
-            sma_tp = tp.rolling(20).mean()
-            mad = tp.rolling(20).apply(lambda x: np.mean(np.abs(x - np.mean(x))))
-            df['CCI_20'] = (tp - sma_tp) / (0.015 * mad)
+            # Commodity Channel Index (CCI); deviation over strided windows rather than a per-window Python lambda
+            tp = (high + low + close) / 3
+            sma_tp = pd.Series(tp).rolling(20).mean().to_numpy()
+            mad = _rolling_mean_abs_deviation(tp, 20)
+            cols['CCI_20'] = (tp - sma_tp) / (0.015 * mad)
             
             logger.debug("Computed momentum indicators")
             
         except Exception as e:
-            logger.error(f"Error computing momentum indicators: {str(e)}")
+            logger.error(f"Error computing momentum indicators: {str(e)}", exc_info=True)
         
-        return df
+        return cols
     
-    def _compute_volatility_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _compute_volatility_indicators(self, df: pd.DataFrame, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
         """Compute volatility-based indicators"""
         try:
             # ATR (14) - Average True Range
-            atr = AverageTrueRange(df['High'], df['Low'], df['Close'], window=14)
-            df['ATR_14'] = atr.average_true_range()
+            cols['ATR_14'] = _average_true_range(
+                df['High'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64),
+                df['Close'].to_numpy(dtype=np.float64), 14
+            )
             
             # Bollinger Bands (20, 2)
             bb = BollingerBands(df['Close'], window=20, window_dev=2)
-            df['BB_Upper'] = bb.bollinger_hband()
-            df['BB_Middle'] = bb.bollinger_mavg()
-            df['BB_Lower'] = bb.bollinger_lband()
-            df['BB_Width'] = (df['BB_Upper'] - df['BB_Lower']) / df['BB_Middle']
-            df['BB_Position'] = (df['Close'] - df['BB_Lower']) / (df['BB_Upper'] - df['BB_Lower'])
+            bb_upper = bb.bollinger_hband().to_numpy()
+            bb_middle = bb.bollinger_mavg().to_numpy()
+            bb_lower = bb.bollinger_lband().to_numpy()
+            bb_band = bb_upper - bb_lower
+            cols['BB_Upper'] = bb_upper
+            cols['BB_Middle'] = bb_middle
+            cols['BB_Lower'] = bb_lower
+            cols['BB_Width'] = bb_band / bb_middle
+            cols['BB_Position'] = (df['Close'].to_numpy(dtype=np.float64) - bb_lower) / bb_band
             
             # Historical Volatility (20-day)
             returns = df['Close'].pct_change()
-            df['HV_20'] = returns.rolling(20).std() * np.sqrt(252) * 100
+            cols['HV_20'] = returns.rolling(20).std().to_numpy() * np.sqrt(252) * 100
             
             logger.debug("Computed volatility indicators")
             
         except Exception as e:
-            logger.error(f"Error computing volatility indicators: {str(e)}")
+            logger.error(f"Error computing volatility indicators: {str(e)}", exc_info=True)
         
-        return df
+        return cols
     
-    def _compute_volume_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _compute_volume_indicators(self, df: pd.DataFrame, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
         """Compute volume-based indicators"""
         try:
+            volume = df['Volume'].to_numpy(dtype=np.float64)
+            
             # On-Balance Volume (OBV)
             obv = OnBalanceVolumeIndicator(df['Close'], df['Volume'])
-            df['OBV'] = obv.on_balance_volume()
+            cols['OBV'] = obv.on_balance_volume().to_numpy()
             
             # Volume Weighted Average Price (20)
             vwap = VolumeWeightedAveragePrice(df['High'], df['Low'], df['Close'], df['Volume'], window=20)
-            df['Volume_SMA_20'] = vwap.volume_weighted_average_price()
+            volume_sma_20 = vwap.volume_weighted_average_price().to_numpy()
+            cols['Volume_SMA_20'] = volume_sma_20
             
             # Volume Rate of Change
-            df['Volume_ROC'] = df['Volume'].pct_change(periods=10)
+            cols['Volume_ROC'] = df['Volume'].pct_change(periods=10).to_numpy()
             
             # Price-Volume Trend (PVT)
-            df['PVT'] = (df['Volume'] * df['Close'].pct_change()).cumsum()
+            cols['PVT'] = (df['Volume'] * df['Close'].pct_change()).cumsum().to_numpy()
             
             # Volume Weighted Average Price (VWAP)
-            df['VWAP'] = (df['Volume'] * (df['High'] + df['Low'] + df['Close']) / 3).cumsum() / df['Volume'].cumsum()
+            cols['VWAP'] = ((df['Volume'] * (df['High'] + df['Low'] + df['Close']) / 3).cumsum() / df['Volume'].cumsum()).to_numpy()
             
             # Volume Profile
-            df['Volume_Ratio'] = df['Volume'] / df['Volume_SMA_20']
+            cols['Volume_Ratio'] = volume / volume_sma_20
             
             logger.debug("Computed volume indicators")
             
         except Exception as e:
-            logger.error(f"Error computing volume indicators: {str(e)}")
+            logger.error(f"Error computing volume indicators: {str(e)}", exc_info=True)
         
-        return df
+        return cols
     
-    def _compute_other_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _compute_other_indicators(self, df: pd.DataFrame, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
         """Compute additional useful indicators"""
         try:
-            # Pivot Points
-            df['Pivot'] = (df['High'].shift(1) + df['Low'].shift(1) + df['Close'].shift(1)) / 3
-            df['R1'] = 2 * df['Pivot'] - df['Low'].shift(1)
-            df['S1'] = 2 * df['Pivot'] - df['High'].shift(1)
-            df['R2'] = df['Pivot'] + (df['High'].shift(1) - df['Low'].shift(1))
-            df['S2'] = df['Pivot'] - (df['High'].shift(1) - df['Low'].shift(1))
+            close = df['Close'].to_numpy(dtype=np.float64)
+            
+            # Pivot Points (prior bar shifted once, range shared by R2/S2)
+            prev_high = df['High'].shift(1).to_numpy(dtype=np.float64)
+            prev_low = df['Low'].shift(1).to_numpy(dtype=np.float64)
+            pivot = (prev_high + prev_low + df['Close'].shift(1).to_numpy(dtype=np.float64)) / 3
+            prev_range = prev_high - prev_low
+            cols['Pivot'] = pivot
+            cols['R1'] = 2 * pivot - prev_low
+            cols['S1'] = 2 * pivot - prev_high
+            cols['R2'] = pivot + prev_range
+            cols['S2'] = pivot - prev_range
             
             # Daily Returns
-            df['Daily_Return'] = df['Close'].pct_change()
+            daily_return = df['Close'].pct_change().to_numpy()
+            cols['Daily_Return'] = daily_return
             
             # Cumulative Returns
-            df['Cumulative_Return'] = (1 + df['Daily_Return']).cumprod() - 1
+            cols['Cumulative_Return'] = pd.Series(1 + daily_return).cumprod().to_numpy() - 1
+            
+            # Trend columns come from this run or, when precomputed, from df itself
+            def trend(name):
+                return cols[name] if name in cols else df[name].to_numpy(dtype=np.float64)
             
             # Moving Average Convergence Divergence signals
-            df['MACD_Cross'] = np.where(df['MACD'] > df['MACD_Signal'], 1, -1)
+            cols['MACD_Cross'] = np.where(trend('MACD') > trend('MACD_Signal'), 1, -1)
             
             # EMA Cross signals
-            df['EMA_Cross'] = np.where(df['EMA_12'] > df['EMA_26'], 1, -1)
+            cols['EMA_Cross'] = np.where(trend('EMA_12') > trend('EMA_26'), 1, -1)
             
             # SMA Cross signals
-            df['SMA_Cross'] = np.where(df['SMA_50'] > df['SMA_200'], 1, -1)
+            sma_50 = trend('SMA_50')
+            sma_200 = trend('SMA_200')
+            cols['SMA_Cross'] = np.where(sma_50 > sma_200, 1, -1)
             
             # Price relative to moving averages
-            df['Price_vs_SMA_50'] = (df['Close'] - df['SMA_50']) / df['SMA_50'] * 100
-            df['Price_vs_SMA_200'] = (df['Close'] - df['SMA_200']) / df['SMA_200'] * 100
+            cols['Price_vs_SMA_50'] = (close - sma_50) / sma_50 * 100
+            cols['Price_vs_SMA_200'] = (close - sma_200) / sma_200 * 100
             
             logger.debug("Computed additional indicators")
             
         except Exception as e:
-            logger.error(f"Error computing additional indicators: {str(e)}")
+            logger.error(f"Error computing additional indicators: {str(e)}", exc_info=True)
         
-        return df
+        return cols
     
     def get_indicator_summary(self, df: pd.DataFrame) -> Dict[str, Dict]:
         """Get summary of all computed indicators"""
         if df.empty:
             return {}
         
-        latest = df.iloc[-1]
+        latest = df.iloc[-1].to_dict()
         summary = {}
         
         # Trend indicators
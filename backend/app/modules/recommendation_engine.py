@@ -41,21 +41,23 @@ class RecommendationEngine:
             'Strong Sell': 0.06    # 6% stop loss (vs 20% profit from current)
         }
     
-    def generate_recommendations(self, df: pd.DataFrame, ticker: str) -> Dict:
-        """Generate comprehensive recommendation for a ticker"""
+    def generate_recommendations(self, df: pd.DataFrame, ticker: str, timestamp: Optional[str] = None) -> Dict:
+        """Generate comprehensive recommendation for a ticker, stamped with timestamp or the current time"""
         if df.empty:
             return self._empty_recommendation(ticker)
         
         try:
-            latest_data = df.iloc[-1]
-            current_price = latest_data.get('Close', 0)
+            # Extract the latest row once; plain dict lookups are much cheaper than repeated Series.get calls
+            latest = df.iloc[-1].to_dict()
+            g = latest.get
+            current_price = g('Close', 0)
             
             if current_price <= 0:
                 logger.warning(f"Invalid price for {ticker}: {current_price}")
                 return self._empty_recommendation(ticker)
             
             # Get final score and recommendation
-            final_score = latest_data.get('Final_Score_Normalized', 0)
+            final_score = g('Final_Score_Normalized', 0)
             recommendation = self._score_to_recommendation(final_score)
             
             # Calculate target and stop loss prices
@@ -69,7 +71,7 @@ class RecommendationEngine:
             technical_indicators = self._get_technical_indicators(df)
             
             # Generate reasoning
-            reasoning = self._generate_reasoning(df, final_score, recommendation)
+            reasoning = self._generate_reasoning(latest, final_score, recommendation)
             
             # Calculate price change percentage
             change_pct = self._calculate_price_change(df)
@@ -87,21 +89,21 @@ class RecommendationEngine:
                 'confidence_level': confidence,
                 'technical_indicators': technical_indicators,
                 'reasoning': reasoning,
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': timestamp or datetime.utcnow().isoformat(),
                 
                 # Additional data for enhanced features
-                'signal_strength': latest_data.get('Signal_Strength', 'Moderate'),
-                'signal_direction': latest_data.get('Signal_Direction', 'Neutral'),
-                'trend_score': float(latest_data.get('Trend_Signal', 0)),
-                'momentum_score': float(latest_data.get('Momentum_Signal', 0)),
-                'volatility_score': float(latest_data.get('Volatility_Signal', 0)),
-                'volume_score': float(latest_data.get('Volume_Signal_Combined', 0)),
+                'signal_strength': g('Signal_Strength', 'Moderate'),
+                'signal_direction': g('Signal_Direction', 'Neutral'),
+                'trend_score': float(g('Trend_Signal', 0)),
+                'momentum_score': float(g('Momentum_Signal', 0)),
+                'volatility_score': float(g('Volatility_Signal', 0)),
+                'volume_score': float(g('Volume_Signal_Combined', 0)),
                 
                 # Technical indicator values
-                'rsi': float(latest_data.get('RSI_14', 0)),
-                'macd': float(latest_data.get('MACD', 0)),
-                'sma_20': float(latest_data.get('SMA_20', latest_data.get('SMA_50', 0))),
-                'sma_50': float(latest_data.get('SMA_50', 0)),
+                'rsi': float(g('RSI_14', 0)),
+                'macd': float(g('MACD', 0)),
+                'sma_20': float(g('SMA_20', g('SMA_50', 0))),
+                'sma_50': float(g('SMA_50', 0)),
                 
                 # Fundamental data placeholder (can be enhanced later)
                 'fundamental': {
@@ -116,7 +118,7 @@ class RecommendationEngine:
             return recommendation_data
             
         except Exception as e:
-            logger.error(f"Error generating recommendation for {ticker}: {str(e)}")
+            logger.error(f"Error generating recommendation for {ticker}: {str(e)}", exc_info=True)
             return self._empty_recommendation(ticker)
     
     def _score_to_recommendation(self, score: float) -> str:
@@ -197,12 +199,11 @@ class RecommendationEngine:
         
         return indicators
     
-    def _generate_reasoning(self, df: pd.DataFrame, score: float, recommendation: str) -> str:
-        """Generate detailed reasoning for the recommendation"""
-        if df.empty:
+    def _generate_reasoning(self, latest: Dict, score: float, recommendation: str) -> str:
+        """Generate detailed reasoning for the recommendation from the latest row's values"""
+        if not latest:
             return "Insufficient data for analysis"
         
-        latest = df.iloc[-1]
         reasons = []
         
         # Trend-based reasoning
@@ -267,8 +268,8 @@ class RecommendationEngine:
         if len(df) < 2:
             return 0.0
         
-        current_price = df.iloc[-1]['Close']
-        previous_price = df.iloc[-2]['Close']
+        close = df['Close'].to_numpy()
+        current_price, previous_price = close[-1], close[-2]
         
         if previous_price == 0:
             return 0.0
@@ -330,7 +331,7 @@ class RecommendationEngine:
                 recommendation = self.generate_recommendations(df, ticker)
                 recommendations.append(recommendation)
             except Exception as e:
-                logger.error(f"Error processing {ticker}: {str(e)}")
+                logger.error(f"Error processing {ticker}: {str(e)}", exc_info=True)
                 recommendations.append(self._empty_recommendation(ticker))
         
         return recommendations
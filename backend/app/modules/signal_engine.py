@@ -3,7 +3,7 @@ Signal Engine Module - Generates individual indicator signals and aggregates int
 """
 
 import pandas as pd
-# import numpy as np
+import numpy as np
 import warnings
 from typing import Dict, List, Tuple, Optional
 import logging
@@ -80,7 +80,7 @@ class SignalEngine:
             logger.info(f"Generated signals for {len(df_signals)} data points")
             
         except Exception as e:
-            logger.error(f"Error generating signals: {str(e)}")
+            logger.error(f"Error generating signals: {str(e)}", exc_info=True)
             return df
         
         return df_signals
@@ -140,7 +140,7 @@ class SignalEngine:
             logger.debug("Generated trend signals")
             
         except Exception as e:
-            logger.error(f"Error generating trend signals: {str(e)}")
+            logger.error(f"Error generating trend signals: {str(e)}", exc_info=True)
             df['Trend_Signal'] = 0
         
         return df
@@ -203,7 +203,7 @@ class SignalEngine:
             logger.debug("Generated momentum signals")
             
         except Exception as e:
-            logger.error(f"Error generating momentum signals: {str(e)}")
+            logger.error(f"Error generating momentum signals: {str(e)}", exc_info=True)
             df['Momentum_Signal'] = 0
         
         return df
@@ -253,7 +253,7 @@ class SignalEngine:
             logger.debug("Generated volatility signals")
             
         except Exception as e:
-            logger.error(f"Error generating volatility signals: {str(e)}")
+            logger.error(f"Error generating volatility signals: {str(e)}", exc_info=True)
             df['Volatility_Signal'] = 0
         
         return df
@@ -308,7 +308,7 @@ class SignalEngine:
             logger.debug("Generated volume signals")
             
         except Exception as e:
-            logger.error(f"Error generating volume signals: {str(e)}")
+            logger.error(f"Error generating volume signals: {str(e)}", exc_info=True)
             df['Volume_Signal_Combined'] = 0
         
         return df
@@ -345,7 +345,7 @@ class SignalEngine:
             logger.debug("Aggregated signals into final score")
             
         except Exception as e:
-            logger.error(f"Error aggregating signals: {str(e)}")
+            logger.error(f"Error aggregating signals: {str(e)}", exc_info=True)
             df['Final_Score'] = 0
             df['Final_Score_Normalized'] = 0
             df['Signal_Strength'] = 'Moderate'
@@ -358,7 +358,7 @@ class SignalEngine:
         if df.empty:
             return {}
         
-        latest = df.iloc[-1]
+        latest = df.iloc[-1].to_dict()
         
         return {
             'final_score': latest.get('Final_Score_Normalized', 0),
@@ -391,4 +391,5 @@ class SignalEngine:
         
         available_columns = [col for col in columns if col in df.columns]
         
-        return df[available_columns].tail(periods)
+        # Slice rows first so only the tail is copied out of the wide signal frame
+        return df.tail(periods)[available_columns]
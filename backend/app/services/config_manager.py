@@ -3,11 +3,19 @@ Configuration management service for updating stock lists
 """
 
 import os
+import sys
+import json
+import heapq
+from functools import lru_cache
+import threading
+import time
+from operator import itemgetter
 import boto3
 from typing import List, Dict, Any
 from botocore.exceptions import ClientError
 from datetime import datetime
 import logging
+from app.config import CONFIG_CACHE_TTL
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +34,60 @@ s3_client = boto3.client('s3')
 # Config file mapping - single consolidated file
 CONFIG_FILE = 'config.json'
 
+# Parsed local config keyed by path -> (st_mtime_ns, config_data)
+_LOCAL_CONFIG_CACHE: Dict[str, tuple] = {}
+
+# Consolidated S3 config as (monotonic time, last_modified, config_data); every config type shares one object
+_s3_config_cache = None
+_s3_config_lock = threading.Lock()
+
+
+def _read_s3_config():
+    """
+    Fetch and parse config.json from S3, reusing the result for CONFIG_CACHE_TTL seconds
+    
+    Returns (last_modified, config_data). S3/JSON errors propagate and are not cached.
+    Callers must not mutate config_data.
+    """
+    global _s3_config_cache
+    cached = _s3_config_cache
+    if cached and time.monotonic() - cached[0] < CONFIG_CACHE_TTL:
+        return cached[1], cached[2]
+    
+    with _s3_config_lock:
+        cached = _s3_config_cache
+        if cached and time.monotonic() - cached[0] < CONFIG_CACHE_TTL:
+            return cached[1], cached[2]
+        response = s3_client.get_object(Bucket=BUCKET_NAME, Key=CONFIG_FILE)
+        config_data = json.loads(response['Body'].read().decode('utf-8'))
+        _s3_config_cache = (time.monotonic(), response['LastModified'], config_data)
+        return response['LastModified'], config_data
+
+
+def _invalidate_s3_config():
+    """Drop the cached S3 config so the next read sees a fresh write"""
+    global _s3_config_cache
+    with _s3_config_lock:
+        _s3_config_cache = None
+
+
+def _read_local_config(config_file: str) -> Dict[str, Any]:
+    """
+    Read and parse a local JSON config, reusing the parsed result while the file is unchanged
+    
+    Raises FileNotFoundError if the file does not exist. Callers must not mutate the result.
+    """
+    mtime = os.stat(config_file).st_mtime_ns
+    cached = _LOCAL_CONFIG_CACHE.get(config_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    with open(config_file, 'r') as f:
+        config_data = json.load(f)
+    
+    _LOCAL_CONFIG_CACHE[config_file] = (mtime, config_data)
+    return config_data
+
 
 def load_config_from_s3(config_type: str) -> Dict[str, Any]:
     """
@@ -46,12 +108,7 @@ def load_config_from_s3(config_type: str) -> Dict[str, Any]:
         key = CONFIG_FILE
         
         try:
-            response = s3_client.get_object(Bucket=BUCKET_NAME, Key=key)
-            content = response['Body'].read().decode('utf-8')
-            
-            # Parse JSON content
-            import json
-            config_data = json.loads(content)
+            last_modified, config_data = _read_s3_config()
             
             # Validate JSON structure
             if not isinstance(config_data, dict) or 'configurations' not in config_data:
@@ -69,8 +126,8 @@ def load_config_from_s3(config_type: str) -> Dict[str, Any]:
             if not isinstance(symbols, list):
                 return {'success': False, 'error': f'Symbols must be a list for {config_type}'}
             
-            # Clean up symbols (remove empty strings, convert to uppercase)
-            clean_symbols = [symbol.strip().upper() for symbol in symbols if symbol.strip()]
+            # Clean up symbols (remove empty strings, convert to uppercase) and intern for fast dict lookups
+            clean_symbols = [sys.intern(symbol.strip().upper()) for symbol in symbols if symbol.strip()]
             
             return {
                 'success': True,
@@ -80,7 +137,7 @@ def load_config_from_s3(config_type: str) -> Dict[str, Any]:
                 'name': category_config.get('name', config_type.title()),
                 'description': category_config.get('description', ''),
                 'source': 's3',
-                'last_modified': response['LastModified'].isoformat(),
+                'last_modified': last_modified.isoformat(),
                 'config_last_updated': config_data.get('last_updated', '')
             }
             
@@ -118,16 +175,11 @@ def load_config_from_local(config_type: str) -> Dict[str, Any]:
         
         config_file = CONFIG_FILE
         
-        if not os.path.exists(config_file):
+        try:
+            config_data = _read_local_config(config_file)
+        except FileNotFoundError:
             return {'success': False, 'error': f'Configuration file {config_file} not found'}
         
-        with open(config_file, 'r') as f:
-            content = f.read()
-        
-        # Parse JSON content
-        import json
-        config_data = json.loads(content)
-        
         # Validate JSON structure
         if not isinstance(config_data, dict) or 'configurations' not in config_data:
             return {'success': False, 'error': 'Invalid JSON configuration format'}
@@ -241,6 +293,7 @@ def update_config_in_s3(config_type: str, symbols: List[str], backup: bool = Tru
             ContentType='application/json',
             ServerSideEncryption='AES256'
         )
+        _invalidate_s3_config()
         
         logger.info(f"Successfully updated {config_type} configuration with {len(valid_symbols)} symbols")
         
@@ -277,20 +330,18 @@ def backup_config_in_s3(config_type: str) -> Dict[str, Any]:
         
         key = CONFIG_FILE
         
-        # Check if config exists
+        # Copy server-side; a missing source surfaces as NoSuchKey
         try:
-            response = s3_client.get_object(Bucket=BUCKET_NAME, Key=key)
-            content = response['Body'].read()
-            
             # Create backup with timestamp
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
             backup_key = f'config/backups/config_{timestamp}.json'
             
-            s3_client.put_object(
+            s3_client.copy_object(
                 Bucket=BUCKET_NAME,
                 Key=backup_key,
-                Body=content,
+                CopySource={'Bucket': BUCKET_NAME, 'Key': key},
                 ContentType='application/json',
+                MetadataDirective='REPLACE',
                 ServerSideEncryption='AES256'
             )
             
@@ -324,11 +375,7 @@ def get_all_configs() -> Dict[str, Any]:
         key = CONFIG_FILE
         
         try:
-            response = s3_client.get_object(Bucket=BUCKET_NAME, Key=key)
-            content = response['Body'].read().decode('utf-8')
-            
-            import json
-            config_data = json.loads(content)
+            _, config_data = _read_s3_config()
             
             return {
                 'success': True,
@@ -354,6 +401,20 @@ def get_all_configs() -> Dict[str, Any]:
         return {'success': False, 'error': f'Failed to get configurations: {str(e)}'}
 
 
+@lru_cache(maxsize=512)
+def _symbol_exists(symbol: str) -> bool:
+    """
+    Look a symbol up on Yahoo Finance, memoized per symbol
+    
+    Lookup errors propagate and are therefore not cached, so a transient
+    failure is retried on the next validation.
+    """
+    import yfinance as yf
+    
+    info = yf.Ticker(symbol).info
+    return bool(info and ('symbol' in info or 'shortName' in info))
+
+
 def validate_symbols(symbols: List[str]) -> Dict[str, Any]:
     """
     Validate stock symbols with enhanced error handling
@@ -365,23 +426,18 @@ def validate_symbols(symbols: List[str]) -> Dict[str, Any]:
         Dict with validation results
     """
     try:
-        import yfinance as yf
-        
         valid_symbols = []
         invalid_symbols = []
         
-        # Test each symbol
+        # Test each symbol; repeats across requests (UI re-validation, config updates) hit the cache
         for symbol in symbols:
             symbol = symbol.upper().strip()
             if not symbol:
                 continue
                 
             try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
-                
                 # Check if we got valid data
-                if info and ('symbol' in info or 'shortName' in info):
+                if _symbol_exists(symbol):
                     valid_symbols.append(symbol)
                 else:
                     invalid_symbols.append(symbol)
@@ -543,28 +599,25 @@ def get_config_history(config_type: str, limit: int = 10) -> Dict[str, Any]:
             return {'success': False, 'error': f'Invalid config type: {config_type}'}
         
         prefix = f'config/backups/{config_type}_'
-        backups = []
+        candidates = []
         
         paginator = s3_client.get_paginator('list_objects_v2')
         for page in paginator.paginate(Bucket=BUCKET_NAME, Prefix=prefix):
             for obj in page.get('Contents', []):
-                key = obj['Key']
-                last_modified = obj['LastModified']
-                size = obj['Size']
-                
                 # Extract timestamp from filename
-                timestamp_str = key.split('_')[-1].replace('.txt', '')
-                
-                backups.append({
-                    'key': key,
-                    'timestamp': timestamp_str,
-                    'last_modified': last_modified.isoformat(),
-                    'size': size
-                })
-        
-        # Sort by timestamp (newest first) and limit
-        backups.sort(key=lambda x: x['timestamp'], reverse=True)
-        backups = backups[:limit]
+                timestamp_str = obj['Key'].split('_')[-1].replace('.txt', '')
+                candidates.append((timestamp_str, obj))
+        
+        # Keep the newest `limit` backups, then build rows only for those
+        backups = [
+            {
+                'key': obj['Key'],
+                'timestamp': timestamp_str,
+                'last_modified': obj['LastModified'].isoformat(),
+                'size': obj['Size']
+            }
+            for timestamp_str, obj in heapq.nlargest(limit, candidates, key=itemgetter(0))
+        ]
         
         return {
             'success': True,
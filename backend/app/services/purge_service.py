@@ -201,7 +201,7 @@ class PurgeService:
             for date_str, files in date_groups.items():
                 if len(files) > 1:
                     # Sort by last modified and keep the newest
-                    files.sort(key=lambda x: self._get_file_last_modified(x), reverse=True)
+                    files.sort(key=self._get_file_last_modified, reverse=True)
                     files_to_remove = files[1:]  # Remove all but the newest
                     
                     for file_key in files_to_remove:
@@ -87,17 +87,26 @@ def build_enhanced_notification_message(recommendations: List[Recommendation]) -
             'sound': 'none'
         }
     
-    # Handle both Recommendation objects and dictionaries
+    # Handle both Recommendation objects and dictionaries; collect BUY
+    # recommendations and count high-confidence ones in a single pass
     significant_recs = []
+    high_confidence_count = 0
     for r in recommendations:
         if hasattr(r, 'recommendation'):
             # It's a Recommendation object
-            if r.recommendation in ['Strong Buy', 'Buy']:
-                significant_recs.append(r)
+            rec_type = r.recommendation
+            conf = getattr(r, 'confidence_level', 'Medium')
         elif isinstance(r, dict):
             # It's a dictionary
-            if r.get('recommendation') in ['Strong Buy', 'Buy']:
-                significant_recs.append(r)
+            rec_type = r.get('recommendation')
+            conf = r.get('confidence_level', 'Medium')
+        else:
+            continue
+        
+        if rec_type in ('Strong Buy', 'Buy'):
+            significant_recs.append(r)
+            if conf == 'High':
+                high_confidence_count += 1
     
     if not significant_recs:
         return {
@@ -147,13 +156,6 @@ def build_enhanced_notification_message(recommendations: List[Recommendation]) -
     priority = 0
     sound = 'pushover'
     
-    # High confidence recommendations
-    high_confidence_count = 0
-    for rec in significant_recs:
-        conf = getattr(rec, 'confidence_level', 'Medium') if hasattr(rec, 'confidence_level') else rec.get('confidence_level', 'Medium')
-        if conf == 'High':
-            high_confidence_count += 1
-    
     if count >= 5 or high_confidence_count >= 3:
         priority = 1  # High priority
         sound = 'spacealarm'
@@ -456,13 +458,18 @@ def get_notification_stats(recommendations: List[Recommendation]) -> Dict[str, A
     if not recommendations:
         return {'total': 0, 'significant': 0, 'high_confidence': 0}
     
-    significant_recs = [r for r in recommendations if r.recommendation in ['Strong Buy', 'Buy']]
-    high_confidence_recs = [r for r in significant_recs if r.confidence_level == 'High']
+    significant = 0
+    high_confidence = 0
+    for r in recommendations:
+        if r.recommendation in ('Strong Buy', 'Buy'):
+            significant += 1
+            if r.confidence_level == 'High':
+                high_confidence += 1
     
     return {
         'total': len(recommendations),
-        'significant': len(significant_recs),
-        'high_confidence': len(high_confidence_recs),
-        'will_notify': len(significant_recs) > 0,
-        'priority': 'high' if len(significant_recs) >= 5 or len(high_confidence_recs) >= 3 else 'normal' if len(significant_recs) >= 3 else 'low'
+        'significant': significant,
+        'high_confidence': high_confidence,
+        'will_notify': significant > 0,
+        'priority': 'high' if significant >= 5 or high_confidence >= 3 else 'normal' if significant >= 3 else 'low'
     }
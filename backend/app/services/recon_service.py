@@ -2,22 +2,24 @@
 Reconciliation service for tracking recommendation performance
 """
 
-import boto3
 import os
-import json
+import orjson
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 import yfinance as yf
 import logging
 from app.models import ReconData, Recommendation
+from app.json_utils import dumps
+from app.services.s3_store import s3_client as _shared_s3_client, read_object_body
 
 logger = logging.getLogger(__name__)
 
 class ReconService:
     """Service for reconciling recommendations with actual performance"""
     
-    def __init__(self):
-        self.s3_client = boto3.client('s3')
+    def __init__(self, s3_client=None):
+        # Share s3_store's client so warm invocations reuse its session and keep-alive pool
+        self.s3_client = s3_client or _shared_s3_client
         self.bucket_name = os.getenv('S3_BUCKET_NAME')
     
     def run_daily_recon(self) -> Dict[str, Any]:
@@ -110,7 +112,7 @@ class ReconService:
                 Bucket=self.bucket_name,
                 Key='data/latest.json'
             )
-            return json.loads(response['Body'].read().decode('utf-8'))
+            return orjson.loads(read_object_body(response))
         except Exception as e:
             logger.error(f"Error getting latest recommendations: {str(e)}")
             return None
@@ -126,13 +128,13 @@ class ReconService:
                 'date': today,
                 'timestamp': datetime.utcnow().isoformat(),
                 'count': len(recon_results),
-                'reconciliations': [recon.__dict__ for recon in recon_results]
+                'reconciliations': recon_results  # ReconData dataclasses, serialized natively by orjson
             }
             
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=recon_key,
-                Body=json.dumps(recon_data, indent=2),
+                Body=dumps(recon_data, indent=True),
                 ContentType='application/json'
             )
             
@@ -180,7 +182,7 @@ class ReconService:
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key='data/latest.json',
-                Body=json.dumps(updated_data, indent=2),
+                Body=dumps(updated_data, indent=True),
                 ContentType='application/json'
             )
             
@@ -200,7 +202,7 @@ class ReconService:
                 'date': today,
                 'timestamp': datetime.utcnow().isoformat(),
                 'count': len(recon_results),
-                'reconciliations': [recon.__dict__ for recon in recon_results],
+                'reconciliations': recon_results,
                 'data_type': 'daily_reconciliation',
                 'version': '2.0'
             }
@@ -208,7 +210,7 @@ class ReconService:
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=daily_website_key,
-                Body=json.dumps(recon_data, indent=2),
+                Body=dumps(recon_data, indent=True),
                 ContentType='application/json',
                 ServerSideEncryption='AES256'
             )
@@ -232,7 +234,7 @@ class ReconService:
                     Bucket=self.bucket_name,
                     Key=summary_key
                 )
-                current_summary = json.loads(response['Body'].read().decode('utf-8'))
+                current_summary = orjson.loads(response['Body'].read().decode('utf-8'))
             except self.s3_client.exceptions.NoSuchKey:
                 current_summary = {
                     'total_reconciled': 0,
@@ -277,7 +279,7 @@ class ReconService:
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=summary_key,
-                Body=json.dumps(current_summary, indent=2),
+                Body=dumps(current_summary, indent=True),
                 ContentType='application/json',
                 ServerSideEncryption='AES256'
             )
@@ -309,7 +311,7 @@ class ReconService:
                         Bucket=self.bucket_name,
                         Key=recon_key
                     )
-                    recon_data = json.loads(response['Body'].read().decode('utf-8'))
+                    recon_data = orjson.loads(response['Body'].read().decode('utf-8'))
                     
                     for recon in recon_data.get('reconciliations', []):
                         summary['total_reconciled'] += 1
@@ -349,7 +351,10 @@ class ReconService:
             logger.error(f"Error getting recon summary: {str(e)}")
             return {'error': str(e)}
 
+# Built once per container; the service holds no per-run state
+_recon_service = ReconService()
+
+
 def run_daily_reconciliation() -> Dict[str, Any]:
     """Main function to run daily reconciliation"""
-    recon_service = ReconService()
-    return recon_service.run_daily_recon()
+    return _recon_service.run_daily_recon()
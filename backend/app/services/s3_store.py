@@ -2,24 +2,44 @@
 S3 storage service for persisting and retrieving recommendations
 """
 
+import gzip
 import json
 import boto3
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from botocore.exceptions import ClientError
 from app.models import Recommendation
 from app.logger import get_logger
+from app.json_utils import dumps
 
 logger = get_logger()
 
 # Configuration
 BUCKET_NAME = os.getenv('S3_BUCKET_NAME', '7h-stock-analyzer-dev')
 AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
+LATEST_CACHE_TTL = int(os.getenv('LATEST_CACHE_TTL', '60'))  # seconds latest.json is served without asking S3
 
 # Initialize S3 client
 s3_client = boto3.client('s3')
 
+# Side requests (e.g. the daily listing) overlap with a run's uploads; reused across warm invocations
+_io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='s3-io')
+
+# Result files are stored gzip'd (Content-Encoding: gzip); level 1 keeps compression off the critical path
+RESULTS_GZIP_LEVEL = 1
+
+
+def read_object_body(response: Dict[str, Any]) -> bytes:
+    """Read a get_object body, undoing gzip Content-Encoding (boto3 does not decompress)"""
+    body = response['Body'].read()
+    if response.get('ContentEncoding') == 'gzip':
+        body = gzip.decompress(body)
+    return body
+
 
 def persist_results(recommendations: List[Recommendation]) -> bool:
     """
@@ -48,30 +68,42 @@ def persist_results(recommendations: List[Recommendation]) -> bool:
             }
         }
         
-        # Save latest.json (overwrites)
+        # List existing daily files while the uploads below are in flight
+        listing = _io_executor.submit(_list_daily_dates)
+        
+        # Serialize and compress once; browsers and CloudFront decode Content-Encoding transparently
+        body = gzip.compress(dumps(data, indent=True), compresslevel=RESULTS_GZIP_LEVEL)
+        
+        # Save latest.json (overwrites) - the only upload of the payload
         latest_key = 'data/latest.json'
         s3_client.put_object(
             Bucket=BUCKET_NAME,
             Key=latest_key,
-            Body=json.dumps(data, indent=2),
+            Body=body,
             ContentType='application/json',
+            ContentEncoding='gzip',
             ServerSideEncryption='AES256'
         )
+        invalidate_latest_results()
         logger.info(f"Saved latest results to s3://{BUCKET_NAME}/{latest_key}")
         
-        # Save daily file (immutable)
+        # Save daily file (immutable) as a server-side copy; metadata incl. encoding is carried over
         daily_key = f'data/daily/{date_str}.json'
-        s3_client.put_object(
+        s3_client.copy_object(
             Bucket=BUCKET_NAME,
             Key=daily_key,
-            Body=json.dumps(data, indent=2),
-            ContentType='application/json',
+            CopySource={'Bucket': BUCKET_NAME, 'Key': latest_key},
             ServerSideEncryption='AES256'
         )
         logger.info(f"Saved daily results to s3://{BUCKET_NAME}/{daily_key}")
         
-        # Update dates.json file
-        update_available_dates()
+        # Update dates.json file from the overlapped listing; rescan if that listing failed
+        try:
+            dates = listing.result() + [date_str]
+        except Exception as e:
+            logger.warning(f"Daily listing failed, rescanning for dates.json: {e}")
+            dates = None
+        update_available_dates(dates)
         
         return True
         
@@ -109,7 +141,7 @@ def persist_enhanced_historical_data(date: str, enhanced_data: Dict[str, Any]) -
         s3_client.put_object(
             Bucket=BUCKET_NAME,
             Key=enhanced_key,
-            Body=json.dumps(data, indent=2),
+            Body=dumps(data, indent=True),
             ContentType='application/json',
             ServerSideEncryption='AES256'
         )
@@ -153,32 +185,78 @@ def get_available_dates() -> List[str]:
         return []
 
 
+# Last good latest.json as (monotonic time, etag, data); revalidated with If-None-Match once stale
+_latest_cache = None
+_latest_lock = threading.Lock()
+
+
 def get_latest_results() -> Dict[str, Any]:
     """Get the latest recommendations from S3"""
+    return get_latest_results_with_etag()[1]
+
+
+def get_latest_results_with_etag() -> Tuple[Optional[str], Dict[str, Any]]:
+    """
+    Get the latest recommendations and the S3 ETag they were read with
+    
+    Served from memory for LATEST_CACHE_TTL seconds, then revalidated with a
+    conditional GET so an unchanged file costs no body transfer or parse.
+    The ETag is None for error results, which are never cached. Callers must
+    not mutate the returned data.
+    """
+    global _latest_cache
+    cached = _latest_cache
+    if cached and time.monotonic() - cached[0] < LATEST_CACHE_TTL:
+        return cached[1], cached[2]
+    
+    with _latest_lock:
+        cached = _latest_cache
+        if cached and time.monotonic() - cached[0] < LATEST_CACHE_TTL:
+            return cached[1], cached[2]
+        
+        etag, data = _fetch_latest_results(cached[1] if cached else None)
+        if data is None:  # 304: cached copy is still current
+            etag, data = cached[1], cached[2]
+        if etag is not None:
+            _latest_cache = (time.monotonic(), etag, data)
+        return etag, data
+
+
+def invalidate_latest_results():
+    """Forget the cached latest.json after this process rewrites it"""
+    global _latest_cache
+    with _latest_lock:
+        _latest_cache = None
+
+
+def _fetch_latest_results(if_none_match: Optional[str] = None) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """GET latest.json, returning (etag, data); data is None when S3 answers 304 Not Modified"""
     try:
-        response = s3_client.get_object(
-            Bucket=BUCKET_NAME,
-            Key='data/latest.json'
-        )
+        request = {'Bucket': BUCKET_NAME, 'Key': 'data/latest.json'}
+        if if_none_match:
+            request['IfNoneMatch'] = if_none_match
+        response = s3_client.get_object(**request)
         
-        content = response['Body'].read().decode('utf-8')
+        content = read_object_body(response).decode('utf-8')
         
         # Handle empty content
         if not content.strip():
             logger.warning("Empty latest.json content found in S3")
-            return {'error': 'No data available'}
+            return None, {'error': 'No data available'}
         
         data = json.loads(content)
-        return data
+        return response.get('ETag'), data
         
     except ClientError as e:
+        if e.response.get('ResponseMetadata', {}).get('HTTPStatusCode') == 304:
+            return if_none_match, None
         if e.response['Error']['Code'] == 'NoSuchKey':
-            return {'error': 'No latest results found'}
+            return None, {'error': 'No latest results found'}
         logger.error(f"S3 client error: {e}", error=str(e), operation="get_latest_results")
-        return {'error': f'S3 error: {str(e)}'}
+        return None, {'error': f'S3 error: {str(e)}'}
     except Exception as e:
         logger.error(f"Error getting latest results: {e}", error=str(e), operation="get_latest_results")
-        return {'error': f'Error: {str(e)}'}
+        return None, {'error': f'Error: {str(e)}'}
 
 
 def get_historical_results(date: str, include_recon: bool = False) -> Dict[str, Any]:
@@ -199,7 +277,7 @@ def get_historical_results(date: str, include_recon: bool = False) -> Dict[str,
             Key=f'data/daily/{date}.json'
         )
         
-        data = json.loads(response['Body'].read().decode('utf-8'))
+        data = json.loads(read_object_body(response).decode('utf-8'))
         
         # If reconciliation data is requested, try to enhance the recommendations
         if include_recon and 'recommendations' in data:
@@ -510,27 +588,35 @@ def cleanup_old_files(days_threshold: int = 1000) -> Dict[str, Any]:
         return {'success': False, 'error': str(e)}
 
 
-def update_available_dates() -> bool:
+def _list_daily_dates() -> List[str]:
+    """Dates that have a data/daily/<date>.json file; S3 errors propagate"""
+    response = s3_client.list_objects_v2(Bucket=BUCKET_NAME, Prefix='data/daily/')
+    dates = []
+    
+    if 'Contents' in response:
+        for obj in response['Contents']:
+            key = obj['Key']
+            if key.endswith('.json') and key != 'data/daily/dates.json':
+                # Extract date from filename (e.g., 'data/daily/2026-02-01.json' -> '2026-02-01')
+                date = key.split('/')[-1].replace('.json', '')
+                dates.append(date)
+    return dates
+
+
+def update_available_dates(dates: Optional[List[str]] = None) -> bool:
     """
     Update the dates.json file with all available historical dates
     
-    Scans the data/daily/ directory and creates/updates dates.json
+    Scans the data/daily/ directory and creates/updates dates.json, unless
+    the caller already holds the date list (persist_results lists while uploading)
     """
     try:
         # List all objects in data/daily/
-        response = s3_client.list_objects_v2(Bucket=BUCKET_NAME, Prefix='data/daily/')
-        dates = []
-        
-        if 'Contents' in response:
-            for obj in response['Contents']:
-                key = obj['Key']
-                if key.endswith('.json') and key != 'data/daily/dates.json':
-                    # Extract date from filename (e.g., 'data/daily/2026-02-01.json' -> '2026-02-01')
-                    date = key.split('/')[-1].replace('.json', '')
-                    dates.append(date)
+        if dates is None:
+            dates = _list_daily_dates()
         
         # Sort dates in descending order (newest first)
-        dates.sort(reverse=True)
+        dates = sorted(set(dates), reverse=True)
         
         # Create dates.json data
         dates_data = {
@@ -545,7 +631,7 @@ def update_available_dates() -> bool:
         s3_client.put_object(
             Bucket=BUCKET_NAME,
             Key='data/dates.json',
-            Body=json.dumps(dates_data, indent=2),
+            Body=dumps(dates_data, indent=True),
             ContentType='application/json',
             ServerSideEncryption='AES256'
         )
@@ -612,7 +698,7 @@ def get_historical_data(date: str) -> Dict[str, Any]:
         # Get historical data from S3
         key = f'data/daily/{date}.json'
         response = s3_client.get_object(Bucket=BUCKET_NAME, Key=key)
-        content = response['Body'].read().decode('utf-8')
+        content = read_object_body(response).decode('utf-8')
         data = json.loads(content)
         
         # Add metadata
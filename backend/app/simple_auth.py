@@ -3,15 +3,28 @@ Simple API Key Authentication - No Complexity, Good Security
 """
 
 import os
+import hmac
 from fastapi import HTTPException, Header, Depends
 from functools import wraps
 
 # Static API key from environment variables
 API_KEY = os.getenv('API_KEY')
 REQUIRE_AUTH = os.getenv('REQUIRE_AUTH', 'true').lower() == 'true'
+_API_KEY_BYTES = API_KEY.encode() if API_KEY else b''
 
-def verify_api_key(x_api_key: str = Header(None, alias='X-API-Key')):
-    """Simple API key verification"""
+def api_key_accepted(raw_key: bytes = None) -> bool:
+    """True when a request carrying raw_key (header bytes) would pass verify_api_key"""
+    if not REQUIRE_AUTH:
+        return True
+    return bool(_API_KEY_BYTES and raw_key and hmac.compare_digest(raw_key, _API_KEY_BYTES))
+
+async def verify_api_key(x_api_key: str = Header(None, alias='X-API-Key')):
+    """
+    Simple API key verification
+    
+    Declared async so FastAPI runs it inline on the event loop instead of
+    dispatching a sync dependency to the threadpool on every request.
+    """
     if not REQUIRE_AUTH:
         return True  # Skip auth in development
     
@@ -21,7 +34,7 @@ def verify_api_key(x_api_key: str = Header(None, alias='X-API-Key')):
             detail="API key not configured"
         )
     
-    if not x_api_key or x_api_key != API_KEY:
+    if not x_api_key or not hmac.compare_digest(x_api_key.encode(), _API_KEY_BYTES):
         raise HTTPException(
             status_code=403, 
             detail="Invalid API key"
@@ -33,7 +33,9 @@ rm -rf "$LAYER_DIR"
 mkdir -p "$LAYER_DIR/python"
 
 cd "$LAYER_DIR/python"
-pip install fastapi==0.68.2 mangum==0.12.2 boto3==1.26.137 requests==2.28.2 --target . --no-deps --force-reinstall --quiet
+# orjson is a native extension: fetch wheels built for the Lambda runtime (x86_64, CPython 3.10), not the build host
+pip install fastapi==0.68.2 mangum==0.12.2 boto3==1.26.137 requests==2.28.2 orjson==3.8.3 --target . --no-deps --force-reinstall --quiet \
+    --platform manylinux2014_x86_64 --only-binary=:all: --python-version 3.10 --implementation cp
 cd ../..
 
 # Package layer
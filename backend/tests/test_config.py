@@ -0,0 +1,41 @@
+"""
+Tests for symbol file parsing in app.config
+"""
+
+import sys
+import os
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app import config
+from app.config import _read_symbols_file
+
+
+class TestReadSymbolsFile:
+    """Test suite for reading ticker lists from config files"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        config._symbols_cache.clear()
+
+    def teardown_method(self):
+        """Leave no parsed files behind for other tests"""
+        config._symbols_cache.clear()
+
+    def _read(self, tmp_path, text):
+        path = tmp_path / 'config_symbols.txt'
+        path.write_text(text, encoding='utf-8')
+        return _read_symbols_file(str(path))
+
+    def test_yahoo_symbols_are_kept_verbatim(self, tmp_path):
+        """Index, futures, FX and share-class symbols are not truncated or dropped"""
+        symbols = self._read(tmp_path, "^GSPC\nES=F\neurusd=x\nBRK.B\nbf-b\n")
+
+        assert symbols == ('^GSPC', 'ES=F', 'EURUSD=X', 'BRK.B', 'BF-B')
+
+    def test_comments_blanks_and_duplicates(self, tmp_path):
+        """Comment and blank lines are skipped, trailing comments cut, repeats dropped in file order"""
+        symbols = self._read(tmp_path, "# portfolio\n\nmsft\n// legacy\n  AAPL  \nMSFT  # again\nES=F # futures\n")
+
+        assert symbols == ('MSFT', 'AAPL', 'ES=F')
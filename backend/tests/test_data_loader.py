@@ -0,0 +1,225 @@
+"""
+Tests for the data loader's S3 and in-process price caches
+"""
+
+import io
+import sys
+import os
+import pandas as pd
+import numpy as np
+from botocore.exceptions import ClientError
+from yfinance.exceptions import YFRateLimitError
+from unittest.mock import Mock, patch
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.modules import data_loader
+from app.modules.data_loader import DataLoader, CACHE_FILE
+
+
+class TestS3CacheMaintenance:
+    """Test suite for S3 cache listing and clearing"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.loader = DataLoader(s3_bucket='test-bucket', use_s3_cache=False)
+        self.loader.use_s3_cache = True
+        self.loader.s3_client = Mock()
+
+        # Two listing pages: cached tickers mixed with the bucket's other objects
+        self.pages = [
+            {'Contents': [
+                {'Key': f'AAPL/{CACHE_FILE}', 'Size': 1024},
+                {'Key': 'data/latest.json', 'Size': 2048},
+                {'Key': 'index.html', 'Size': 512},
+            ]},
+            {'Contents': [
+                {'Key': f'MSFT/{CACHE_FILE}', 'Size': 1024},
+                {'Key': 'config/config.json', 'Size': 256},
+            ]},
+            {},
+        ]
+        self.loader.s3_client.get_paginator.return_value.paginate.return_value = self.pages
+
+    def test_cache_stats_cover_every_page(self):
+        """Stats count cache objects from all listing pages and nothing else"""
+        stats = self.loader.get_cache_stats()
+
+        assert stats['cached_tickers'] == 2
+        assert stats['tickers'] == ['AAPL', 'MSFT']
+
+    def test_clear_all_only_deletes_cache_objects(self):
+        """A bucket-wide clear must leave results, config and site files in place"""
+        assert self.loader.clear_cache() is True
+
+        deleted = [
+            obj['Key']
+            for call in self.loader.s3_client.delete_objects.call_args_list
+            for obj in call.kwargs['Delete']['Objects']
+        ]
+        assert deleted == [f'AAPL/{CACHE_FILE}', f'MSFT/{CACHE_FILE}']
+
+
+def _sample_prices(rows: int = 30) -> pd.DataFrame:
+    """Small daily OHLCV frame"""
+    close = np.linspace(100, 110, rows)
+    return pd.DataFrame({
+        'Open': close,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': np.full(rows, 1000000.0)
+    }, index=pd.date_range('2024-01-01', periods=rows, freq='D'))
+
+
+class TestS3ConditionalGet:
+    """Test suite for reading the S3 cache with IfModifiedSince"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.loader = DataLoader(s3_bucket='test-bucket', use_s3_cache=False)
+        self.loader.use_s3_cache = True
+        self.loader.s3_client = Mock()
+        self.sample_df = _sample_prices()
+
+        # Serialize through _save_to_cache so the body is exactly what the loader writes
+        self.loader._save_to_cache('AAPL', self.sample_df)
+        self.body = self.loader.s3_client.put_object.call_args.kwargs['Body'].encode()
+
+    def test_request_is_conditional_on_ttl(self):
+        """The GET carries an IfModifiedSince cutoff one day past the TTL"""
+        self.loader.s3_client.get_object.return_value = {'Body': io.BytesIO(self.body)}
+        self.loader._get_from_cache('AAPL')
+
+        kwargs = self.loader.s3_client.get_object.call_args.kwargs
+        assert kwargs['Key'] == f'AAPL/{CACHE_FILE}'
+        age = data_loader.datetime.now(data_loader.timezone.utc) - kwargs['IfModifiedSince']
+        assert abs(age.total_seconds() - (self.loader.cache_ttl_days + 1) * 86400) < 60
+
+    def test_fresh_object_is_loaded(self):
+        """A 200 response is parsed back into the cached frame"""
+        self.loader.s3_client.get_object.return_value = {'Body': io.BytesIO(self.body)}
+        df = self.loader._get_from_cache('AAPL')
+
+        assert df is not None
+        assert list(df.index) == list(self.sample_df.index)
+        assert df['Close'].tolist() == self.sample_df['Close'].tolist()
+
+    def test_not_modified_is_a_miss(self):
+        """S3's 304 for an expired object is treated as no cache"""
+        self.loader.s3_client.get_object.side_effect = ClientError(
+            {'Error': {'Code': '304', 'Message': 'Not Modified'},
+             'ResponseMetadata': {'HTTPStatusCode': 304}},
+            'GetObject'
+        )
+
+        assert self.loader._get_from_cache('AAPL') is None
+
+
+class TestPriceCache:
+    """Test suite for the in-process cache of recent fetches"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        data_loader._price_cache.clear()
+        self.sample_df = _sample_prices()
+
+    def teardown_method(self):
+        """Leave no cached frames behind for other tests"""
+        data_loader._price_cache.clear()
+
+    def test_hit_returns_independent_copy(self):
+        """Callers get equal frames they can modify without touching the cache"""
+        data_loader._store_cached_prices('AAPL', '1y', self.sample_df.copy())
+
+        first = data_loader._get_cached_prices('AAPL', '1y')
+        first['Close'] = 0.0
+        second = data_loader._get_cached_prices('AAPL', '1y')
+
+        assert second is not first
+        pd.testing.assert_frame_equal(second, self.sample_df)
+
+    def test_period_is_part_of_the_key(self):
+        """A different period for the same ticker is a miss"""
+        data_loader._store_cached_prices('AAPL', '1y', self.sample_df)
+
+        assert data_loader._get_cached_prices('AAPL', '6mo') is None
+
+    def test_entry_expires_after_ttl(self):
+        """Frames older than PRICE_CACHE_TTL are not served"""
+        data_loader._store_cached_prices('AAPL', '1y', self.sample_df)
+
+        now = data_loader.time.monotonic()
+        with patch.object(data_loader.time, 'monotonic', return_value=now + data_loader.PRICE_CACHE_TTL + 1):
+            assert data_loader._get_cached_prices('AAPL', '1y') is None
+
+    def test_store_prunes_entries_past_max_age(self):
+        """Storing a frame drops entries older than PRICE_CACHE_MAX_AGE"""
+        data_loader._store_cached_prices('AAPL', '1y', self.sample_df)
+
+        now = data_loader.time.monotonic()
+        with patch.object(data_loader.time, 'monotonic', return_value=now + data_loader.PRICE_CACHE_MAX_AGE + 1):
+            data_loader._store_cached_prices('MSFT', '1y', self.sample_df)
+
+        assert set(data_loader._price_cache) == {('MSFT', '1y')}
+
+    def test_s3_hit_is_remembered(self):
+        """A frame read from S3 is served from memory on the next lookup"""
+        loader = DataLoader(s3_bucket='test-bucket', use_s3_cache=False)
+        loader.use_s3_cache = True
+        loader.s3_client = Mock()
+
+        with patch.object(loader, '_get_from_cache', return_value=self.sample_df.copy()) as s3_read:
+            loader._get_cached('AAPL', '1y')
+            df = loader._get_cached('AAPL', '1y')
+
+        assert s3_read.call_count == 1
+        pd.testing.assert_frame_equal(df, self.sample_df)
+
+
+class TestBatchDownload:
+    """Test suite for rate-limit handling in multi-ticker downloads"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        data_loader._price_cache.clear()
+        self.loader = DataLoader(s3_bucket='test-bucket', use_s3_cache=False)
+        prices = _sample_prices(5)
+        self.batch = pd.concat({'AAPL': prices, 'MSFT': prices}, axis=1)
+        self.throttled = pd.DataFrame(np.nan, index=self.batch.index, columns=self.batch.columns)
+
+    def teardown_method(self):
+        """Leave no cached frames behind for other tests"""
+        data_loader._price_cache.clear()
+
+    def test_rate_limited_batch_is_retried(self):
+        """An all-empty batch or YFRateLimitError backs off and downloads again"""
+        with patch.object(data_loader.yf, 'download', side_effect=[self.throttled, YFRateLimitError(), self.batch]) as download, \
+                patch.object(data_loader.time, 'sleep') as sleep:
+            frames = self.loader._download_batch(['AAPL', 'MSFT'], '1y')
+
+        assert download.call_count == 3
+        assert sleep.call_count == 2
+        assert set(frames) == {'AAPL', 'MSFT'}
+
+    def test_empty_batch_skips_per_ticker_fallback(self):
+        """A batch still empty after its retries is not re-requested one ticker at a time"""
+        with patch.object(data_loader.yf, 'download', return_value=self.throttled), \
+                patch.object(data_loader.time, 'sleep'), \
+                patch.object(self.loader, 'fetch_single_ticker') as single:
+            results = self.loader.fetch_batch(['AAPL', 'MSFT'], '1y')
+
+        single.assert_not_called()
+        assert results == {}
+
+    def test_ticker_missing_from_partial_batch_falls_back(self):
+        """Only tickers absent from an otherwise good batch are fetched individually"""
+        partial = self.batch.copy()
+        partial['MSFT'] = np.nan
+        with patch.object(data_loader.yf, 'download', return_value=partial), \
+                patch.object(self.loader, 'fetch_single_ticker', return_value=pd.DataFrame()) as single:
+            results = self.loader.fetch_batch(['AAPL', 'MSFT'], '1y')
+
+        single.assert_called_once_with('MSFT', '1y')
+        assert list(results) == ['AAPL']
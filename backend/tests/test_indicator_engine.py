@@ -0,0 +1,86 @@
+"""
+Tests for the indicator engine's per-process indicator memo
+"""
+
+import sys
+import os
+import pandas as pd
+import numpy as np
+from unittest.mock import patch
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.modules import indicator_engine
+from app.modules.indicator_engine import IndicatorEngine
+
+
+class TestIndicatorCache:
+    """Test suite for memoized indicator frames"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        indicator_engine._indicator_cache.clear()
+        self.engine = IndicatorEngine()
+
+        np.random.seed(42)  # For reproducible tests
+        close = 100 + np.random.normal(0, 1, 120).cumsum()
+        self.sample_df = pd.DataFrame({
+            'Open': close,
+            'High': close + 1,
+            'Low': close - 1,
+            'Close': close,
+            'Volume': np.random.uniform(1000000, 5000000, 120)
+        }, index=pd.date_range('2024-01-01', periods=120, freq='B'))
+
+    def teardown_method(self):
+        """Leave no memoized frames behind for other tests"""
+        indicator_engine._indicator_cache.clear()
+
+    def test_hit_returns_equal_copy(self):
+        """Identical prices are served from the memo as a distinct, equal frame"""
+        first = self.engine.compute_all_indicators(self.sample_df.copy())
+        with patch.object(self.engine, '_compute_trend_indicators') as trend:
+            second = self.engine.compute_all_indicators(self.sample_df.copy())
+
+        trend.assert_not_called()
+        assert second is not first
+        pd.testing.assert_frame_equal(second, first)
+
+    def test_caller_mutation_does_not_leak(self):
+        """Changing a returned frame must not change what later callers get"""
+        first = self.engine.compute_all_indicators(self.sample_df.copy())
+        expected = first['RSI_14'].copy()
+        first['RSI_14'] = 0.0
+
+        hit = self.engine.compute_all_indicators(self.sample_df.copy())
+        hit.loc[hit.index[-1], 'EMA_12'] = -1.0
+
+        again = self.engine.compute_all_indicators(self.sample_df.copy())
+        pd.testing.assert_series_equal(again['RSI_14'], expected)
+        assert again['EMA_12'].iat[-1] != -1.0
+
+    def test_changed_price_misses(self):
+        """A different last close is a different key and is recomputed"""
+        first = self.engine.compute_all_indicators(self.sample_df.copy())
+
+        moved = self.sample_df.copy()
+        moved.iloc[-1, moved.columns.get_loc('Close')] += 5.0
+        second = self.engine.compute_all_indicators(moved)
+
+        assert len(indicator_engine._indicator_cache) == 2
+        assert second['Close'].iat[-1] == first['Close'].iat[-1] + 5.0
+        assert second['EMA_12'].iat[-1] != first['EMA_12'].iat[-1]
+
+    def test_least_recently_used_is_evicted(self):
+        """Past INDICATOR_CACHE_SIZE the entry not read for longest is dropped"""
+        frame = pd.DataFrame({'Close': [1.0]})
+        with patch.object(indicator_engine, 'INDICATOR_CACHE_SIZE', 2):
+            indicator_engine._store_cached_indicators(b'a', frame)
+            indicator_engine._store_cached_indicators(b'b', frame)
+            assert indicator_engine._get_cached_indicators(b'a') is not None
+            indicator_engine._store_cached_indicators(b'c', frame)
+
+        assert indicator_engine._get_cached_indicators(b'b') is None
+        assert indicator_engine._get_cached_indicators(b'a') is not None
+        assert indicator_engine._get_cached_indicators(b'c') is not None
@@ -0,0 +1,58 @@
+"""
+Tests for the modular analysis engine
+"""
+
+import sys
+import os
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.engine import modular_recommender
+from app.engine.modular_recommender import ModularStockAnalyzer
+
+
+class TestEmptyAnalysis:
+    """Test suite for the placeholder result of a failed ticker"""
+
+    def test_results_do_not_share_nested_containers(self):
+        """Filling one empty result's details must not leak into the next"""
+        analyzer = ModularStockAnalyzer(use_cache=False)
+        first = analyzer._empty_analysis('AAPL')
+        first['detailed_analysis']['signal_history'].append({'signal': 'buy'})
+        first['detailed_analysis']['data_validation']['rows'] = 0
+
+        second = analyzer._empty_analysis('MSFT')
+
+        assert second['symbol'] == 'MSFT'
+        assert second['recommendation'] == 'Hold'
+        assert second['detailed_analysis'] == {
+            'indicator_summary': {},
+            'signal_summary': {},
+            'signal_history': [],
+            'data_validation': {}
+        }
+
+
+class TestProcessPool:
+    """Test suite for the shared analysis worker pool"""
+
+    def teardown_method(self):
+        """Shut down any pool a test created"""
+        if modular_recommender._process_pool is not None:
+            modular_recommender._process_pool.shutdown()
+            modular_recommender._process_pool = None
+
+    def test_pool_is_shared_and_not_forked(self):
+        """Every run gets the same pool, whose workers never fork the threaded API process"""
+        pool = modular_recommender._get_process_pool()
+
+        assert modular_recommender._get_process_pool() is pool
+        assert pool._mp_context.get_start_method() in ('forkserver', 'spawn')
+
+    def test_broken_pool_is_replaced(self):
+        """After a worker dies the next run starts a fresh pool"""
+        pool = modular_recommender._get_process_pool()
+        modular_recommender._discard_process_pool(pool)
+
+        assert modular_recommender._get_process_pool() is not pool
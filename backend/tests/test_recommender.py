@@ -0,0 +1,132 @@
+"""
+Tests for the batch recommender's process-wide analysis memo
+"""
+
+import sys
+import os
+import pandas as pd
+import numpy as np
+from unittest.mock import patch
+from yfinance.exceptions import YFRateLimitError
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.engine import recommender
+from app.engine.recommender import StockRecommendationEngine
+
+
+class TestAnalysisCache:
+    """Test suite for memoized symbol analyses"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        recommender._analysis_cache.clear()
+
+        rng = np.random.default_rng(7)
+        close = 100 + rng.normal(0, 1, 120).cumsum()
+        self.sample_df = pd.DataFrame({
+            'Open': close,
+            'High': close + 1,
+            'Low': close - 1,
+            'Close': close,
+            'Volume': np.full(120, 1_000_000.0)
+        }, index=pd.date_range('2024-01-01', periods=120, freq='B'))
+
+    def _engine(self, df):
+        engine = StockRecommendationEngine(['TEST'])
+        engine.data_cache['TEST'] = df
+        return engine
+
+    def test_unchanged_bars_reuse_analysis(self):
+        """A rerun over identical bars returns the memoized analysis"""
+        first = self._engine(self.sample_df)._analyze_technical('TEST')
+        second = self._engine(self.sample_df.copy())._analyze_technical('TEST')
+
+        assert 'error' not in first
+        assert second is first
+
+    def test_live_bar_move_is_not_served_stale(self):
+        """Same last-bar timestamp but a new close/volume must be re-analyzed"""
+        morning = self._engine(self.sample_df)._analyze_technical('TEST')
+
+        later = self.sample_df.copy()
+        later.iloc[-1, later.columns.get_loc('Close')] += 5.0
+        later.iloc[-1, later.columns.get_loc('Volume')] += 250_000.0
+        afternoon = self._engine(later)._analyze_technical('TEST')
+
+        assert afternoon is not morning
+        assert afternoon['summary']['current_price'] == round(later['Close'].iat[-1], 2)
+        assert afternoon['summary']['current_price'] != morning['summary']['current_price']
+
+    def test_expired_entry_is_recomputed(self):
+        """Entries older than ANALYSIS_CACHE_MAX_AGE are not returned"""
+        first = self._engine(self.sample_df)._analyze_technical('TEST')
+
+        now = recommender.time.monotonic()
+        with patch.object(recommender.time, 'monotonic', return_value=now + recommender.ANALYSIS_CACHE_MAX_AGE + 1):
+            second = self._engine(self.sample_df)._analyze_technical('TEST')
+
+        assert second is not first
+        assert second['summary'] == first['summary']
+
+    def test_size_cap_evicts_oldest(self):
+        """Storing past ANALYSIS_CACHE_MAX_ENTRIES drops the oldest key"""
+        with patch.object(recommender, 'ANALYSIS_CACHE_MAX_ENTRIES', 2):
+            for i in range(3):
+                recommender._store_cached_analysis(('S%d' % i, '6mo', 0, 1.0, 1.0), {'i': i})
+
+        assert recommender._get_cached_analysis(('S0', '6mo', 0, 1.0, 1.0)) is None
+        assert recommender._get_cached_analysis(('S2', '6mo', 0, 1.0, 1.0)) == {'i': 2}
+
+
+class TestDownloadBackoff:
+    """Test suite for retrying rate-limited batch downloads"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.engine = StockRecommendationEngine(['AAA', 'BBB'])
+        index = pd.date_range('2024-01-01', periods=3, freq='B')
+        columns = pd.MultiIndex.from_product([['AAA', 'BBB'], ['Close', 'Volume']])
+        self.prices = pd.DataFrame(1.0, index=index, columns=columns)
+        # What yf.download returns when every ticker in the batch was throttled
+        self.throttled = pd.DataFrame(np.nan, index=index, columns=columns)
+
+    def test_empty_batch_is_retried(self):
+        """A batch with no prices for any symbol backs off and tries again"""
+        with patch.object(recommender.yf, 'download', side_effect=[self.throttled, pd.DataFrame(), self.prices]) as download, \
+                patch.object(recommender.time, 'sleep') as sleep:
+            data = self.engine._download_batch(['AAA', 'BBB'])
+
+        assert download.call_count == 3
+        assert sleep.call_count == 2
+        assert data is self.prices
+
+    def test_rate_limit_error_is_retried(self):
+        """YFRateLimitError raised by the download also backs off"""
+        with patch.object(recommender.yf, 'download', side_effect=[YFRateLimitError(), self.prices]) as download, \
+                patch.object(recommender.time, 'sleep'):
+            data = self.engine._download_batch(['AAA', 'BBB'])
+
+        assert download.call_count == 2
+        assert data is self.prices
+
+    def test_partial_batch_is_not_retried(self):
+        """Prices for some symbols mean Yahoo answered; missing ones are not a rate limit"""
+        partial = self.prices.copy()
+        partial['BBB'] = np.nan
+        with patch.object(recommender.yf, 'download', return_value=partial) as download, \
+                patch.object(recommender.time, 'sleep') as sleep:
+            self.engine._download_batch(['AAA', 'BBB'])
+
+        assert download.call_count == 1
+        sleep.assert_not_called()
+
+    def test_single_unknown_symbol_is_not_retried(self):
+        """One empty symbol is treated as unknown rather than throttled"""
+        with patch.object(recommender.yf, 'download', return_value=pd.DataFrame()) as download, \
+                patch.object(recommender.time, 'sleep') as sleep:
+            self.engine._download_batch(['NOPE'])
+
+        assert download.call_count == 1
+        sleep.assert_not_called()
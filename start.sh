@@ -48,8 +48,14 @@ python3 -c "import fastapi, mangum, pandas, yfinance" 2>/dev/null || python -c "
     pip3 install -r requirements.txt 2>/dev/null || pip install -r requirements.txt
 }
 
-# Start FastAPI server
-python3 -m uvicorn app.main:app --host $API_HOST --port $API_PORT --reload &
+# Dev server extras: uvloop event loop and httptools parser
+python3 -c "import uvicorn, uvloop, httptools" 2>/dev/null || {
+    echo "📦 Installing dev server dependencies..."
+    pip3 install uvicorn==0.22.0 uvloop==0.17.0 httptools==0.5.0 2>/dev/null || pip install uvicorn==0.22.0 uvloop==0.17.0 httptools==0.5.0
+}
+
+# Start FastAPI server (API calls are logged by the app middleware, so uvicorn's access log is off)
+python3 -m uvicorn app.main:app --host $API_HOST --port $API_PORT --reload --loop uvloop --http httptools --no-access-log &
 BACKEND_PID=$!
 echo "✅ Backend server started (PID: $BACKEND_PID)"
 cd ..